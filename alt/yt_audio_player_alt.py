@@ -1,25 +1,116 @@
+import atexit
+import csv
+import functools
 import os
 import re
 import subprocess
 import sys
+import tempfile
+import threading
 import shlex
 import msvcrt
+import ctypes
+import _winapi
+
+try:
+    from yt_dlp import YoutubeDL
+except ImportError:  # standalone yt-dlp.exe: metadata goes through the CLI
+    YoutubeDL = None
+
+try:
+    from diskcache import Cache
+except ImportError:  # optional: metadata lookups just aren't cached
+    Cache = None
 
 # ========== CONFIGURATION ==========
 SEARCH_RESULTS = 10  # Default number of search results
 COOKIES_FILE = os.path.join(os.path.dirname(__file__), "cookies.txt")
 YT_DLP = "yt-dlp"
+# every CLI run skips the user's yt-dlp config files (the API never reads them)
+YTDLP_BASE = [YT_DLP, "--ignore-config", "--no-warnings"]
 FFPLAY = "ffplay"
 LOG_ENABLED = True  # Set to False to disable logging
+LOW_LATENCY = True  # Skip ffplay's probe buffering (may clip the first ms)
+DIRECT_URL = True  # ffplay fetches the resolved stream URL itself (needs yt_dlp)
+PIPE_SIZE = 1 << 20  # yt-dlp -> ffplay pipe buffer (Windows default is ~4 KB)
 LOG_FILE = os.path.join(os.path.dirname(__file__), "yt_audio_player.log")
+CACHE_DIR = os.path.join(os.path.dirname(__file__), ".ytcache")
+SEARCH_CACHE_TTL = 3600  # seconds
+PLAYLIST_CACHE_TTL = 86400
+VIDEO_CACHE_TTL = 604800
+
+URL_RE = re.compile(r"^https?://")
+# yt-dlp always runs with redirected output, so it gets no console of its
+# own. ffplay keeps ours: Ctrl+C has to reach it (see play_audio).
+NO_CONSOLE = subprocess.CREATE_NO_WINDOW
+
+kernel32 = ctypes.windll.kernel32
+INFINITE = 0xFFFFFFFF
+WAIT_OBJECT_0 = 0
 
 
 # ========== LOGGING (TOGGLABLE) ==========
-def log(msg):
-    """Write a message to the log file if logging is enabled."""
-    if LOG_ENABLED:
-        with open(LOG_FILE, "a", encoding="utf-8", errors="replace") as f:
-            f.write(msg + "\n")
+_log_fh = None
+
+
+def log(msg, *args):
+    """Write a message to the log file if logging is enabled.
+
+    With args, msg is a %-format string and is only formatted when logging
+    is on, so debug lines cost nothing when it is off.
+    """
+    global _log_fh
+    if not LOG_ENABLED:
+        return
+    if args:
+        msg = msg % args
+    if _log_fh is None:
+        # opened once and kept; buffered lines are flushed when it closes
+        _log_fh = open(LOG_FILE, "a", encoding="utf-8", errors="replace")
+        atexit.register(_log_fh.close)
+    _log_fh.write(msg + "\n")
+    if msg.startswith("[ERROR]"):
+        _log_fh.flush()
+
+
+# ========== METADATA CACHE ==========
+_cache = None
+
+
+def get_cache():
+    """The on-disk cache, opened (and CACHE_DIR created) on first use."""
+    global _cache
+    if _cache is None:
+        _cache = Cache(CACHE_DIR)
+    return _cache
+
+
+def cached(expire):
+    """Memoize a lookup on disk for expire seconds (no-op without diskcache).
+
+    Empty results are not stored, so a failed lookup is retried next time.
+    """
+
+    def decorate(func):
+        if Cache is None:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            key = (func.__name__,) + args
+            cache = get_cache()
+            result = cache.get(key)
+            if result is not None:
+                log("[DEBUG] Cache hit: %s", key)
+                return result
+            result = func(*args)
+            if result:
+                cache.set(key, result, expire=expire)
+            return result
+
+        return wrapper
+
+    return decorate
 
 
 # ========== UTILITY FUNCTIONS ==========
@@ -30,77 +121,178 @@ def has_cookies():
 
 
 def is_url(text):
-    result = re.match(r"^https?://", text.strip()) is not None
-    log(f"[DEBUG] is_url('{text}') -> {result}")
+    result = URL_RE.match(text.strip()) is not None
+    log("[DEBUG] is_url(%r) -> %s", text, result)
     return result
 
 
+def make_pipe(size):
+    """Anonymous pipe with a size-byte buffer, returned as (read_fd, write_fd)."""
+    # os.pipe() and subprocess.PIPE always take the OS default size on Windows
+    read_h, write_h = _winapi.CreatePipe(None, size)
+    return msvcrt.open_osfhandle(read_h, 0), msvcrt.open_osfhandle(write_h, 0)
+
+
 def run_cmd(cmd, silent=True):
-    log(f"[DEBUG] run_cmd: {' '.join(cmd) if isinstance(cmd, list) else cmd}")
+    if LOG_ENABLED:
+        log("[DEBUG] run_cmd: %s", " ".join(cmd) if isinstance(cmd, list) else cmd)
+    # argv lists go straight to CreateProcess; only command strings need
+    # cmd.exe to parse them
+    shell = not isinstance(cmd, list)
     if silent:
         return subprocess.run(
             cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            shell=True,
+            shell=shell,
             encoding="utf-8",
         )
     else:
-        return subprocess.run(cmd, shell=True)
+        return subprocess.run(cmd, shell=shell)
 
 
 # ========== SEARCH & METADATA ==========
+VIDEO_FIELDS = ("id", "title", "channel", "duration")
+
+
+def parse_video_lines(lines):
+    """Video dicts from yt-dlp's tab-separated --print lines."""
+    # QUOTE_NONE: a title starting with a double quote is just text
+    rows = csv.reader(lines, delimiter="\t", quoting=csv.QUOTE_NONE)
+    return [dict(zip(VIDEO_FIELDS, row)) for row in rows if row and row[0]]
+
+
+def iter_output(cmd):
+    """Yield yt-dlp's stdout lines as they are printed.
+
+    stderr goes to a temp file instead of a pipe, so yt-dlp can't stall on a
+    full stderr pipe while stdout is being read.
+    """
+    if LOG_ENABLED:
+        log("[DEBUG] Running: %s", " ".join(cmd))
+    with tempfile.TemporaryFile() as err:
+        with subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=err,
+            encoding="utf-8",
+            errors="replace",
+            creationflags=NO_CONSOLE,
+        ) as proc:
+            for line in proc.stdout:
+                line = line.rstrip("\n")
+                log("[DEBUG] yt-dlp stdout: %s", line)
+                yield line
+        err.seek(0)
+        stderr = err.read().decode("utf-8", "replace").strip()
+    if stderr:
+        level = "[ERROR] yt-dlp error" if proc.returncode else "[DEBUG] yt-dlp stderr"
+        log("%s: %s", level, stderr)
+
+
+_ydl_instances = {}
+
+
+def get_ydl(cookies=None, noplaylist=False):
+    """One in-process YoutubeDL per option set, reused for every lookup."""
+    key = (cookies, noplaylist)
+    ydl = _ydl_instances.get(key)
+    if ydl is None:
+        opts = {
+            "quiet": True,
+            "no_warnings": True,
+            "skip_download": True,
+            "extract_flat": "in_playlist",
+            "noplaylist": noplaylist,
+        }
+        if cookies:
+            opts["cookiefile"] = cookies
+        ydl = _ydl_instances[key] = YoutubeDL(opts)
+    return ydl
+
+
+def ydl_extract(url, cookies=None, noplaylist=False):
+    """extract_info through the API; None if yt-dlp raised."""
+    log("[DEBUG] extract_info: %s", url)
+    try:
+        return get_ydl(cookies, noplaylist).extract_info(url, download=False)
+    except Exception as e:
+        log(f"[ERROR] yt-dlp error: {e}")
+        return None
+
+
+def format_duration(seconds):
+    if not seconds:
+        return "NA"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+def video_fields(info):
+    """The {id, title, channel, duration} dict the rest of the script uses."""
+    return {
+        "id": info["id"],
+        "title": info.get("title") or info["id"],
+        "channel": info.get("channel") or info.get("uploader") or "NA",
+        "duration": info.get("duration_string")
+        or format_duration(info.get("duration")),
+    }
+
+
+def info_videos(info):
+    """Video dicts for a playlist/search result, or the video itself."""
+    if not info:
+        return []
+    if "entries" not in info:
+        return [video_fields(info)] if info.get("id") else []
+    return [video_fields(e) for e in info["entries"] if e and e.get("id")]
+
+
+@cached(SEARCH_CACHE_TTL)
 def search_yt(query, n=SEARCH_RESULTS, cookies=None):
-    cmd = [YT_DLP]
+    if YoutubeDL is not None:
+        log(f"[INFO] Searching YouTube for: {query}")
+        videos = info_videos(ydl_extract(f"ytsearch{n}:{query}", cookies))
+        log(f"[INFO] Found {len(videos)} search results.")
+        return videos
+    cmd = list(YTDLP_BASE)
     if cookies:
         cmd += ["--cookies", cookies]
+    # Flat search entries already carry title, channel and duration, so the
+    # per-video watch pages are never fetched.
     cmd += [
         f"ytsearch{n}:{query}",
+        "--flat-playlist",
         "--print",
         "%(id)s\t%(title)s\t%(channel)s\t%(duration_string)s",
         "--skip-download",
-        "--no-warnings",
         "--quiet",
     ]
     log(f"[INFO] Searching YouTube for: {query}")
-    log(f"[DEBUG] Running: {' '.join(cmd)}")
-    result = subprocess.run(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        encoding="utf-8",
-        errors="replace",
-    )
-    log(f"[DEBUG] yt-dlp stdout: {result.stdout}")
-    log(f"[DEBUG] yt-dlp stderr: {result.stderr}")
-    if not result.stdout:
-        if result.stderr:
-            log(f"[ERROR] yt-dlp error: {result.stderr.strip()}")
-        return []
-    lines = result.stdout.strip().splitlines()
-    videos = []
-    for line in lines:
-        parts = line.split("\t")
-        if len(parts) == 4:
-            videos.append(
-                {
-                    "id": parts[0],
-                    "title": parts[1],
-                    "channel": parts[2],
-                    "duration": parts[3],
-                }
-            )
+    videos = [
+        v for v in parse_video_lines(iter_output(cmd)) if len(v) == len(VIDEO_FIELDS)
+    ]
     log(f"[INFO] Found {len(videos)} search results.")
     return videos
 
 
+@cached(PLAYLIST_CACHE_TTL)
 def get_playlist_video_ids(playlist_url, cookies=None):
     """
     Returns a list of dicts: [{id, title, channel, duration}], or [] if not a playlist.
     Logs all output for debugging.
     """
+    if YoutubeDL is not None:
+        log(f"[INFO] Checking playlist: {playlist_url}")
+        videos = info_videos(ydl_extract(playlist_url, cookies))
+        log(f"[INFO] Playlist contains {len(videos)} videos.")
+        return videos
     cmd = [
-        YT_DLP,
+        *YTDLP_BASE,
         "--flat-playlist",
         "--print",
         "%(id)s\t%(title)s\t%(channel)s\t%(duration_string)s",
@@ -109,55 +301,26 @@ def get_playlist_video_ids(playlist_url, cookies=None):
     if cookies:
         cmd += ["--cookies", cookies]
     log(f"[INFO] Checking playlist: {playlist_url}")
-    log(f"[DEBUG] Running: {' '.join(cmd)}")
-    result = subprocess.run(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        encoding="utf-8",
-        errors="replace",
-    )
-    log(f"[DEBUG] yt-dlp stdout: {result.stdout}")
-    log(f"[DEBUG] yt-dlp stderr: {result.stderr}")
-    videos = []
-    if not result.stdout:
+    # parsed as yt-dlp prints, so a huge playlist is never held as one string
+    videos = parse_video_lines(iter_output(cmd))
+    if not videos:
         log("[ERROR] No playlist output from yt-dlp.")
-        return []
-    for line in result.stdout.strip().splitlines():
-        parts = line.split("\t")
-        if len(parts) >= 1 and parts[0]:
-            video = {"id": parts[0]}
-            if len(parts) > 1:
-                video["title"] = parts[1]
-            if len(parts) > 2:
-                video["channel"] = parts[2]
-            if len(parts) > 3:
-                video["duration"] = parts[3]
-            videos.append(video)
     log(f"[INFO] Playlist contains {len(videos)} videos.")
     return videos
 
 
-def get_video_title(video_id, cookies=None):
-    url = f"https://www.youtube.com/watch?v={video_id}"
-    cmd = [YT_DLP, "--print", "%(title)s", "--skip-download", url]
-    if cookies:
-        cmd += ["--cookies", cookies]
-    result = subprocess.run(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        encoding="utf-8",
-        errors="replace",
-    )
-    if result.stdout:
-        return result.stdout.strip().splitlines()[0]
-    return video_id
-
-
+@cached(VIDEO_CACHE_TTL)
 def get_single_video_metadata(video_url, cookies=None):
+    if YoutubeDL is not None:
+        log(f"[INFO] Checking single video: {video_url}")
+        videos = info_videos(ydl_extract(video_url, cookies, noplaylist=True))
+        if not videos:
+            return None
+        log(f"[INFO] Single video metadata: {videos[0]}")
+        return videos[0]
     cmd = [
-        YT_DLP,
+        *YTDLP_BASE,
+        "--no-playlist",
         "--print",
         "%(id)s\t%(title)s\t%(channel)s\t%(duration_string)s",
         "--skip-download",
@@ -166,79 +329,274 @@ def get_single_video_metadata(video_url, cookies=None):
     if cookies:
         cmd += ["--cookies", cookies]
     log(f"[INFO] Checking single video: {video_url}")
-    log(f"[DEBUG] Running: {' '.join(cmd)}")
+    if LOG_ENABLED:
+        log("[DEBUG] Running: %s", " ".join(cmd))
     result = subprocess.run(
         cmd,
+        stdin=subprocess.DEVNULL,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         encoding="utf-8",
         errors="replace",
+        creationflags=NO_CONSOLE,
     )
-    log(f"[DEBUG] yt-dlp stdout: {result.stdout}")
-    log(f"[DEBUG] yt-dlp stderr: {result.stderr}")
+    log("[DEBUG] yt-dlp stdout: %s", result.stdout)
+    log("[DEBUG] yt-dlp stderr: %s", result.stderr)
     if not result.stdout:
         log("[ERROR] No video output from yt-dlp.")
         return None
-    parts = result.stdout.strip().split("\t")
-    if len(parts) >= 1 and parts[0]:
-        video = {"id": parts[0]}
-        if len(parts) > 1:
-            video["title"] = parts[1]
-        if len(parts) > 2:
-            video["channel"] = parts[2]
-        if len(parts) > 3:
-            video["duration"] = parts[3]
-        log(f"[INFO] Single video metadata: {video}")
-        return video
+    videos = parse_video_lines(result.stdout.splitlines())
+    if videos:
+        log(f"[INFO] Single video metadata: {videos[0]}")
+        return videos[0]
     return None
 
 
 # ========== PLAYBACK ==========
-def play_audio(video_id, cookies=None):
-    title = get_video_title(video_id, cookies)
-    log(f"[INFO] Now playing: {title} (id={video_id})")
-    print(f"[PLAYING] {title}")
+def ytdlp_stream_cmd(video_id, cookies=None):
     url = f"https://www.youtube.com/watch?v={video_id}"
-    cmd = [YT_DLP, "-f", "bestaudio", "-o", "-", url]
+    cmd = [*YTDLP_BASE, "--no-playlist", "-f", "bestaudio", "-o", "-", url]
     if cookies:
         cmd += ["--cookies", cookies]
-    ffplay_cmd = [FFPLAY, "-nodisp", "-autoexit", "-loglevel", "quiet", "-i", "-"]
-    log(f"[DEBUG] Running: {' '.join(cmd)} | {' '.join(ffplay_cmd)}")
+    return cmd
+
+
+def spawn_ytdlp(video_id, cookies=None):
+    """Start yt-dlp streaming into a PIPE_SIZE pipe; returns (proc, read_fd)."""
+    cmd = ytdlp_stream_cmd(video_id, cookies)
+    if LOG_ENABLED:
+        log("[DEBUG] Running: %s", " ".join(cmd))
+    # a large pipe lets yt-dlp burst ahead of ffplay instead of both sides
+    # ping-ponging on 4 KB writes
+    read_fd, write_fd = make_pipe(PIPE_SIZE)
     try:
-        ytdlp_proc = subprocess.Popen(
-            cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
-        )
-        ffplay_proc = subprocess.Popen(
-            ffplay_cmd,
-            stdin=ytdlp_proc.stdout,
-            stdout=subprocess.DEVNULL,
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=write_fd,
             stderr=subprocess.DEVNULL,
+            creationflags=NO_CONSOLE,
         )
-        ytdlp_proc.stdout.close()
+    except Exception:
+        os.close(read_fd)
+        raise
+    finally:
+        # the child has its own copy; ours would hold off EOF
+        os.close(write_fd)
+    return proc, read_fd
+
+
+_resolver_instances = {}
+_resolve_lock = threading.Lock()
+
+
+def resolve_stream_input(video_id, cookies=None):
+    """ffplay input args for the direct bestaudio URL, or None on failure."""
+    url = f"https://www.youtube.com/watch?v={video_id}"
+    log(f"[INFO] Resolving stream URL (id={video_id})")
+    # the prefetch thread resolves too; a YoutubeDL isn't safe to share
+    with _resolve_lock:
+        ydl = _resolver_instances.get(cookies)
+        if ydl is None:
+            opts = {
+                "quiet": True,
+                "no_warnings": True,
+                "format": "bestaudio",
+                "noplaylist": True,
+            }
+            if cookies:
+                opts["cookiefile"] = cookies
+            ydl = _resolver_instances[cookies] = YoutubeDL(opts)
+        try:
+            info = ydl.extract_info(url, download=False)
+        except Exception as e:
+            log(f"[ERROR] Could not resolve stream URL for {video_id}: {e}")
+            return None
+    stream_url = info.get("url")
+    if not stream_url:
+        return None
+    # googlevideo can refuse or throttle requests that don't carry the
+    # headers (User-Agent etc.) yt-dlp resolved the URL with
+    headers = dict(info.get("http_headers") or {})
+    args = []
+    user_agent = headers.pop("User-Agent", None)
+    if user_agent:
+        args += ["-user_agent", user_agent]
+    if headers:
+        args += ["-headers", "".join(f"{k}: {v}\r\n" for k, v in headers.items())]
+    return args + ["-reconnect", "1", "-i", stream_url]
+
+
+def open_stream(video_id, cookies=None):
+    """Start a track's audio source; returns (ytdlp_proc, read_fd, input_args).
+
+    In DIRECT_URL mode ffplay is pointed at the resolved URL and no yt-dlp
+    process is left running; otherwise (or if resolving fails) yt-dlp
+    streams into a pipe that ffplay reads as stdin.
+    """
+    if DIRECT_URL and YoutubeDL is not None:
+        input_args = resolve_stream_input(video_id, cookies)
+        if input_args:
+            return None, None, input_args
+    proc, read_fd = spawn_ytdlp(video_id, cookies)
+    return proc, read_fd, ["-i", "-"]
+
+
+def close_stream(stream):
+    proc, read_fd, _ = stream
+    if proc is None:
+        return
+    try:
+        proc.terminate()
+    except Exception:
+        pass
+    os.close(read_fd)
+
+
+class Prefetcher:
+    """Opens the upcoming playlist track's stream while the current one plays.
+
+    The URL resolve (and in pipe mode the first megabyte of audio) happens
+    under playback, so the next track starts without the resolve gap.
+    """
+
+    def __init__(self, cookies=None):
+        self.cookies = cookies
+        self.video_id = None
+        self.thread = None
+        self.stream = None
+        self.lock = threading.Lock()
+
+    def start(self, video_id):
+        self.cancel()
+        log(f"[INFO] Prefetching next track (id={video_id})")
+        thread = threading.Thread(target=self._open, args=(video_id,), daemon=True)
+        with self.lock:
+            self.video_id = video_id
+            self.thread = thread
+        thread.start()
+
+    def _open(self, video_id):
+        try:
+            stream = open_stream(video_id, self.cookies)
+        except Exception as e:
+            log(f"[WARNING] Prefetch failed for {video_id}: {e}")
+            return
+        with self.lock:
+            if self.thread is threading.current_thread():
+                self.stream = stream
+                return
+        # cancelled while opening
+        close_stream(stream)
+
+    def take(self, video_id):
+        """The prefetched stream if it is for video_id, else None."""
+        thread = self.thread
+        if thread is None or self.video_id != video_id:
+            self.cancel()
+            return None
+        thread.join()
+        with self.lock:
+            stream, self.stream = self.stream, None
+            self.video_id = self.thread = None
+        if stream and stream[0] is not None and stream[0].poll() not in (None, 0):
+            # yt-dlp already failed; let play_audio start a fresh one
+            close_stream(stream)
+            return None
+        return stream
+
+    def cancel(self):
+        with self.lock:
+            stream, self.stream = self.stream, None
+            self.video_id = self.thread = None
+        if stream:
+            close_stream(stream)
+
+
+def play_audio(video, cookies=None, prefetcher=None, next_video=None):
+    """Stream one video; video is a metadata dict with at least an "id".
+
+    With a prefetcher, a stream already opened for this video is reused and
+    one for next_video is opened once ffplay is running.
+    """
+    video_id = video["id"]
+    # the search/playlist/metadata lookups already carry the title; never
+    # spend a yt-dlp run just to print it
+    title = video.get("title") or video_id
+    log(f"[INFO] Now playing: {title} (id={video_id})")
+    print(f"[PLAYING] {title}")
+    ffplay_cmd = [FFPLAY, "-nodisp", "-autoexit", "-loglevel", "quiet"]
+    if LOW_LATENCY:
+        ffplay_cmd += [
+            "-probesize",
+            "32",
+            "-analyzeduration",
+            "0",
+            "-fflags",
+            "nobuffer",
+            "-flags",
+            "low_delay",
+        ]
+    ytdlp_proc = ffplay_proc = None
+    try:
+        stream = prefetcher.take(video_id) if prefetcher else None
+        if stream:
+            log(f"[INFO] Using prefetched stream (id={video_id})")
+        else:
+            stream = open_stream(video_id, cookies)
+        ytdlp_proc, read_fd, input_args = stream
+        ffplay_cmd += input_args
+        if LOG_ENABLED:
+            log("[DEBUG] Running: %s", " ".join(ffplay_cmd))
+        try:
+            ffplay_proc = subprocess.Popen(
+                ffplay_cmd,
+                stdin=read_fd if read_fd is not None else subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        finally:
+            if read_fd is not None:
+                os.close(read_fd)
+        if prefetcher and next_video:
+            prefetcher.start(next_video["id"])
         print("[INFO] Press 'n' to skip/next, Ctrl+C to return to main menu.")
+        # Sleep until ffplay exits or console input arrives. Ctrl+C also ends
+        # ffplay (same console group), so the wait returns and the
+        # KeyboardInterrupt is raised right after.
+        stdin_handle = msvcrt.get_osfhandle(sys.stdin.fileno())
+        handles = (ctypes.c_void_p * 2)(int(ffplay_proc._handle), stdin_handle)
         while True:
-            if ffplay_proc.poll() is not None:
+            rc = kernel32.WaitForMultipleObjects(2, handles, False, INFINITE)
+            if rc != WAIT_OBJECT_0 + 1:
+                # ffplay exited (or the wait failed: just play to the end)
+                ffplay_proc.wait()
                 return "done"
-            if msvcrt.kbhit():
-                key = msvcrt.getch()
-                if key in (b"n", b"N"):
-                    print("\n[INFO] Skipped.")
-                    log(f"[INFO] Skipped: {title} (id={video_id})")
-                    ytdlp_proc.terminate()
-                    ffplay_proc.terminate()
-                    return "skip"
-            import time
-
-            time.sleep(0.1)
+            if not msvcrt.kbhit():
+                # focus/mouse/key-up events signal the handle too; drop them
+                kernel32.FlushConsoleInputBuffer(ctypes.c_void_p(stdin_handle))
+                continue
+            key = msvcrt.getch()
+            if key in (b"n", b"N"):
+                print("\n[INFO] Skipped.")
+                log(f"[INFO] Skipped: {title} (id={video_id})")
+                stop_procs(ytdlp_proc, ffplay_proc)
+                return "skip"
     except KeyboardInterrupt:
         print("\n[INFO] Returning to main menu.")
         log(f"[INFO] KeyboardInterrupt during playback: {title} (id={video_id})")
+        stop_procs(ytdlp_proc, ffplay_proc)
+        return "break"
+
+
+def stop_procs(*procs):
+    for proc in procs:
+        if proc is None:
+            continue
         try:
-            ytdlp_proc.terminate()
-            ffplay_proc.terminate()
+            proc.terminate()
         except Exception:
             pass
-        return "break"
 
 
 # ========== DEPENDENCY CHECK & AUTO-INSTALL ==========
@@ -273,7 +631,7 @@ def check_and_install_dependencies():
         if platform.system() == "Windows":
             try:
                 subprocess.check_call(
-                    ["winget", "install", "-e", "--id", "Gyan.FFmpeg"], shell=True
+                    ["winget", "install", "-e", "--id", "Gyan.FFmpeg"]
                 )
                 print(
                     "[INFO] FFmpeg installation attempted. Please restart your terminal or add ffplay to PATH if needed."
@@ -328,20 +686,27 @@ def main():
                 print(
                     f"[INFO] Single video detected: {title}. Streaming audio... (Press 'n' for next, Ctrl+C to exit)"
                 )
-                play_audio(single_video["id"], cookies)
+                play_audio(single_video, cookies)
                 continue
             if len(playlist_videos) > 1:
                 print(
                     f"[INFO] Playlist detected with {len(playlist_videos)} videos. (Press 'n' for next, Ctrl+C to return to main menu)"
                 )
-                for idx, vid in enumerate(playlist_videos, 1):
-                    title = vid.get("title", vid["id"])
-                    print(
-                        f"[INFO] Playing {idx}/{len(playlist_videos)}: {title} (Press 'n' for next, Ctrl+C to return to main menu)"
-                    )
-                    result = play_audio(vid["id"], cookies)
-                    if result == "break":
-                        break
+                prefetcher = Prefetcher(cookies)
+                try:
+                    for idx, vid in enumerate(playlist_videos, 1):
+                        title = vid.get("title", vid["id"])
+                        print(
+                            f"[INFO] Playing {idx}/{len(playlist_videos)}: {title} (Press 'n' for next, Ctrl+C to return to main menu)"
+                        )
+                        next_vid = (
+                            playlist_videos[idx] if idx < len(playlist_videos) else None
+                        )
+                        result = play_audio(vid, cookies, prefetcher, next_vid)
+                        if result == "break":
+                            break
+                finally:
+                    prefetcher.cancel()
                 continue
             else:
                 # Only one video in playlist (not a real playlist)
@@ -350,7 +715,7 @@ def main():
                 print(
                     f"[INFO] Single video detected: {title}. Streaming audio... (Press 'n' for next, Ctrl+C to exit)"
                 )
-                play_audio(vid["id"], cookies)
+                play_audio(vid, cookies)
                 continue
         # Search query
         print(f"[INFO] Searching YouTube for: {user_input}")
@@ -368,16 +733,19 @@ def main():
             if not sel:
                 break
             if sel.isdigit() and 1 <= int(sel) <= len(results):
-                video_id = results[int(sel) - 1]["id"]
-                print(
-                    f'[INFO] Streaming: {results[int(sel)-1]["title"]} (Ctrl+C to skip)'
-                )
-                play_audio(video_id, cookies)
+                video = results[int(sel) - 1]
+                print(f'[INFO] Streaming: {video["title"]} (Ctrl+C to skip)')
+                play_audio(video, cookies)
                 break
             else:
                 print("Invalid selection. Try again.")
 
 
 if __name__ == "__main__":
+    if "--clear-cache" in sys.argv[1:]:
+        if Cache is not None:
+            get_cache().clear()
+        print("[INFO] Metadata cache cleared.")
+        log("[INFO] Metadata cache cleared.")
     check_and_install_dependencies()
     main()
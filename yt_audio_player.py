@@ -5,13 +5,18 @@ Cross-platform, no temp files, auto-installs deps, debug logging, playlist suppo
 """
 
 import argparse
+import contextlib
+import functools
+import itertools
 import json
 import logging
 import os
 import platform
+import queue
 import re
 import subprocess
 import sys
+import threading
 import time
 from pathlib import Path
 from typing import List, Optional
@@ -21,8 +26,25 @@ import random
 import signal
 import atexit
 import traceback
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 
+# Resolved once at import; the playback loops must not re-run uname() or
+# re-import platform modules per iteration.
+IS_WINDOWS = platform.system() == "Windows"
+if IS_WINDOWS:
+    import ctypes
+    import msvcrt
+else:
+    import fcntl
+    import selectors
+    import termios
+    import tty
 
+_VERSION_SPLIT_RE = re.compile(r"[.\-]")
+
+
+@functools.lru_cache(maxsize=128)
 def _is_version_greater(v_new: str, v_old: str) -> bool:
     """Return True if v_new > v_old. Prefer packaging when available, fallback to simple token compare."""
     try:
@@ -32,7 +54,7 @@ def _is_version_greater(v_new: str, v_old: str) -> bool:
     except Exception:
         # fallback: split on non-alphanum and compare token-wise
         def to_tokens(s: str):
-            parts = re.split(r"[\.\-]", s)
+            parts = _VERSION_SPLIT_RE.split(s)
             toks = []
             for p in parts:
                 if p.isdigit():
@@ -49,12 +71,37 @@ try:
 except ImportError:
     yt_dlp = None
 
+# orjson is optional; it serializes history/index files several times faster.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialize obj to indented UTF-8 JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _json_loads(data):
+    """Parse JSON from bytes or str, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 CONFIG_FILE = "config.json"
 LOG_FILE = "logs/player.log"
 COOKIES_FILE = "cookies.txt"
 HISTORY_FILE = "logs/history.json"
 HISTORY_INDEX_FILE = "logs/history_index.json"
 STATE_FILE = "logs/player_state.json"  # Track script state for crash recovery
+YTDLP_LATEST_FILE = "logs/ytdlp_latest.json"  # cached PyPI version lookup
+PROMPT_HISTORY_FILE = "logs/prompt_history"  # readline history for the prompt
+YTDLP_LATEST_TTL = 6 * 3600  # seconds before the PyPI lookup is repeated
+USER_AGENT = "yt-audio-player/1.0"
 
 
 # ------------------------------------------------------------------
@@ -109,7 +156,7 @@ def write_state(state: dict):
 def read_state() -> dict:
     """Read script state for crash recovery."""
     try:
-        if Path(STATE_FILE).exists():
+        if os.path.exists(STATE_FILE):
             with open(STATE_FILE, "r", encoding="utf-8") as f:
                 return json.load(f)
     except Exception as e:
@@ -120,8 +167,8 @@ def read_state() -> dict:
 def clear_state():
     """Clear script state after graceful exit."""
     try:
-        if Path(STATE_FILE).exists():
-            Path(STATE_FILE).unlink()
+        if os.path.exists(STATE_FILE):
+            os.remove(STATE_FILE)
         logging.debug("State cleared after graceful exit")
     except Exception as e:
         logging.debug("Failed to clear state: %s", e)
@@ -151,6 +198,11 @@ def cleanup_crashed_state():
 def cleanup_on_exit():
     """Graceful cleanup when script exits (normal or via signal)."""
     logging.info("Cleaning up and exiting gracefully...")
+    for proc in list(_LIVE_PLAYERS):
+        try:
+            _kill_tree(proc)
+        except Exception as e:
+            logging.debug("Could not stop player pid=%s: %s", proc.pid, e)
     clear_state()
     allow_sleep_windows()
     logging.info("Exit cleanup complete")
@@ -160,6 +212,8 @@ def cleanup_on_exit():
 atexit.register(cleanup_on_exit)
 signal.signal(signal.SIGTERM, lambda s, f: (cleanup_on_exit(), sys.exit(0)))
 signal.signal(signal.SIGINT, lambda s, f: (cleanup_on_exit(), sys.exit(0)))
+if hasattr(signal, "SIGHUP"):
+    signal.signal(signal.SIGHUP, lambda s, f: (cleanup_on_exit(), sys.exit(0)))
 
 
 def track_player_state(proc: subprocess.Popen, url: str = "", title: str = ""):
@@ -182,9 +236,20 @@ def untrack_player_state():
 # ------------------------------------------------------------------
 # Logging
 # ------------------------------------------------------------------
+class _LazyJoin:
+    """Log argument that joins a command list only if the record is emitted."""
+
+    __slots__ = ("cmd",)
+
+    def __init__(self, cmd: List[str]):
+        self.cmd = cmd
+
+    def __str__(self) -> str:
+        return " ".join(self.cmd)
+
+
 def init_logger(debug: bool):
     Path("logs").mkdir(exist_ok=True)
-    # Always allow DEBUG events at the logger level; handlers will filter
     root_logger = logging.getLogger()
     # Remove all handlers associated with the root logger object
     for handler in root_logger.handlers[:]:
@@ -194,9 +259,11 @@ def init_logger(debug: bool):
     formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
     file_handler.setFormatter(formatter)
     stream_handler.setFormatter(formatter)
-    # Keep most verbose logging available internally; handlers decide what
-    # to show. Console should show INFO by default, DEBUG when debug=True.
-    root_logger.setLevel(logging.DEBUG)
+    # Gate at the logger, not just the handlers: with the root at INFO a
+    # disabled logging.debug() returns after a cached level check instead of
+    # building a LogRecord that every handler then throws away.
+    # Console and file show INFO by default, DEBUG when debug=True.
+    root_logger.setLevel(logging.DEBUG if debug else logging.INFO)
     file_handler.setLevel(logging.DEBUG if debug else logging.INFO)
     stream_handler.setLevel(logging.DEBUG if debug else logging.INFO)
     root_logger.addHandler(file_handler)
@@ -213,7 +280,7 @@ def init_logger(debug: bool):
 # Dependency manager
 # ------------------------------------------------------------------
 def is_windows() -> bool:
-    return platform.system() == "Windows"
+    return IS_WINDOWS
 
 
 def installed(cmd: str) -> bool:
@@ -232,6 +299,7 @@ def run_elevated(cmd: List[str], shell=False):
 
 
 def ensure_dependencies(check_mpv=False):
+    global yt_dlp
     logging.debug("Checking dependencies …")
     try:
         import yt_dlp as _yt_dlp
@@ -327,15 +395,17 @@ def ensure_dependencies(check_mpv=False):
             sys.exit("mpv still missing – please install manually.")
         return False
 
-    try:
-        import yt_dlp as _yt_dlp
+    # Only re-import yt_dlp if it was actually installed just now; otherwise
+    # the module from the first check is still valid.
+    if need_yt_dlp:
+        try:
+            import yt_dlp as _yt_dlp
 
-        logging.debug("yt_dlp import successful after install.")
-    except ImportError:
-        logging.error("yt-dlp still missing after attempted install.")
-        sys.exit("yt-dlp still missing – please install manually.")
+            logging.debug("yt_dlp import successful after install.")
+        except ImportError:
+            logging.error("yt-dlp still missing after attempted install.")
+            sys.exit("yt-dlp still missing – please install manually.")
 
-    global yt_dlp
     yt_dlp = _yt_dlp
     return True
 
@@ -373,17 +443,97 @@ def _get_installed_yt_dlp_version() -> Optional[str]:
     return None
 
 
+_HTTP_POOL = None
+
+
+def _http_pool():
+    """Return a shared keep-alive urllib3 pool, or None if urllib3 is missing."""
+    global _HTTP_POOL
+    if _HTTP_POOL is None:
+        try:
+            import urllib3
+        except ImportError:
+            return None
+        _HTTP_POOL = urllib3.PoolManager(
+            num_pools=1, maxsize=2, headers={"User-Agent": USER_AGENT}
+        )
+    return _HTTP_POOL
+
+
 def _get_latest_yt_dlp_version_pypi(timeout: float = 5.0) -> Optional[str]:
     url = "https://pypi.org/pypi/yt-dlp/json"
     try:
-        with urllib.request.urlopen(url, timeout=timeout) as resp:
-            data = json.load(resp)
-            return data.get("info", {}).get("version")
+        pool = _http_pool()
+        if pool is not None:
+            resp = pool.request("GET", url, timeout=timeout)
+            if resp.status != 200:
+                logging.debug("PyPI returned HTTP %s for %s", resp.status, url)
+                return None
+            data = _json_loads(resp.data)
+        else:
+            req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                data = _json_loads(resp.read())
+        return data.get("info", {}).get("version")
     except Exception as e:
         logging.debug("Could not fetch latest yt-dlp version from PyPI: %s", e)
         return None
 
 
+def _cached_latest_yt_dlp_version(
+    ttl: float = YTDLP_LATEST_TTL, force: bool = False
+) -> Optional[str]:
+    """Latest yt-dlp version from PyPI, reusing a recent on-disk answer."""
+    if not force:
+        try:
+            with open(YTDLP_LATEST_FILE, "rb") as f:
+                cached = _json_loads(f.read())
+            if time.time() - cached.get("checked_at", 0) < ttl and cached.get(
+                "version"
+            ):
+                logging.debug("Using cached latest yt-dlp version: %s", cached)
+                return cached["version"]
+        except Exception:
+            pass
+    version = _get_latest_yt_dlp_version_pypi()
+    if version:
+        try:
+            Path(YTDLP_LATEST_FILE).parent.mkdir(exist_ok=True)
+            with open(YTDLP_LATEST_FILE, "wb") as f:
+                f.write(
+                    _json_dumps({"checked_at": int(time.time()), "version": version})
+                )
+        except Exception as e:
+            logging.debug("Could not write %s: %s", YTDLP_LATEST_FILE, e)
+    return version
+
+
+class _BackgroundCall:
+    """Run fn(*args, **kwargs) on a daemon thread, so it never holds up exit."""
+
+    def __init__(self, fn, *args, **kwargs):
+        self._result = None
+        self._done = threading.Event()
+
+        def run():
+            try:
+                self._result = fn(*args, **kwargs)
+            except Exception as e:
+                logging.debug("Background call %s failed: %s", fn.__name__, e)
+            finally:
+                self._done.set()
+
+        threading.Thread(target=run, name=fn.__name__, daemon=True).start()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def result(self, timeout: Optional[float] = None):
+        """The return value, or None if it isn't ready within timeout."""
+        self._done.wait(timeout)
+        return self._result
+
+
 def _detect_install_method() -> str:
     """Try to guess how yt-dlp was installed: 'pip', 'winget', 'pipx', 'self' (binary), or 'unknown'."""
     exe = shutil.which("yt-dlp")
@@ -459,6 +609,77 @@ def _attempt_runtime_update(method: str) -> bool:
 # ------------------------------------------------------------------
 # Config
 # ------------------------------------------------------------------
+_BOOL_TRUE = {"true", "1", "yes", "y"}
+_BOOL_FALSE = {"false", "0", "no", "n"}
+
+
+def _to_bool(v):
+    # handle booleans represented as strings
+    if isinstance(v, str):
+        lv = v.strip().lower()
+        if lv in _BOOL_TRUE:
+            return True
+        if lv in _BOOL_FALSE:
+            return False
+        # fall back to python truthiness
+        return bool(v)
+    return v
+
+
+def _to_int(v):
+    if isinstance(v, bool):
+        return v
+    try:
+        return int(v)
+    except Exception:
+        return v
+
+
+def _to_float(v):
+    if isinstance(v, bool):
+        return v
+    try:
+        return float(v)
+    except Exception:
+        return v
+
+
+# Per-key coercion for values loaded from config.json; keys not listed here
+# (including unknown keys) are kept as-is.
+_COERCERS = {
+    "SearchLimit": _to_int,
+    "Debug": _to_bool,
+    "CacheMaxFiles": _to_int,
+    "CacheRetryCount": _to_int,
+    "CacheRetryBaseDelay": _to_float,
+    "CacheRetryOnNetworkOnly": _to_bool,
+    "CacheDownloadTimeout": _to_int,
+    "ForceCacheRefresh": _to_bool,
+}
+
+
+def _parse_config_value(key: str, v: str):
+    """Coerce a value typed into the interactive config editor."""
+    coerce = _COERCERS.get(key)
+    if coerce:
+        return coerce(v)
+    lv = v.lower()
+    if lv in ("true", "false"):
+        return lv == "true"
+    # only numeric-looking text goes through int()/float(), so plain strings
+    # don't pay for two raised exceptions
+    if v and (v[0].isdigit() or v[0] in "+-."):
+        try:
+            return int(v)
+        except ValueError:
+            pass
+        try:
+            return float(v)
+        except ValueError:
+            pass
+    return v
+
+
 def load_config() -> dict:
     defaults = {
         "SearchLimit": 10,
@@ -474,41 +695,15 @@ def load_config() -> dict:
         "ForceCacheRefresh": False,
     }
     logging.debug("Loading config from %s", CONFIG_FILE)
-    if Path(CONFIG_FILE).exists():
+    if os.path.exists(CONFIG_FILE):
         try:
-            with open(CONFIG_FILE, encoding="utf-8") as f:
-                loaded = json.load(f)
+            with open(CONFIG_FILE, "rb") as f:
+                loaded = _json_loads(f.read())
                 logging.debug("Loaded config: %s", loaded)
                 # Coerce loaded values to match types in defaults
                 for k, v in loaded.items():
-                    if k in defaults:
-                        default_val = defaults[k]
-                        # handle booleans represented as strings
-                        if isinstance(default_val, bool) and isinstance(v, str):
-                            lv = v.strip().lower()
-                            if lv in ("true", "1", "yes", "y"):
-                                defaults[k] = True
-                            elif lv in ("false", "0", "no", "n"):
-                                defaults[k] = False
-                            else:
-                                # fall back to python truthiness
-                                defaults[k] = bool(v)
-                        # handle numeric coercion
-                        elif isinstance(default_val, int) and not isinstance(v, bool):
-                            try:
-                                defaults[k] = int(v)
-                            except Exception:
-                                defaults[k] = v
-                        elif isinstance(default_val, float) and not isinstance(v, bool):
-                            try:
-                                defaults[k] = float(v)
-                            except Exception:
-                                defaults[k] = v
-                        else:
-                            defaults[k] = v
-                    else:
-                        # unknown keys, keep as-is
-                        defaults[k] = v
+                    coerce = _COERCERS.get(k)
+                    defaults[k] = coerce(v) if coerce else v
         except Exception as e:
             logging.warning("Could not load config.json – %s", e)
     else:
@@ -529,7 +724,7 @@ def ydl_opts(cfg: dict, audio_only=True) -> dict:
         "format": "bestaudio/best" if audio_only else "best",
     }
     cookies = cfg.get("CookiesFile", COOKIES_FILE)
-    if Path(cookies).exists():
+    if os.path.exists(cookies):
         opts["cookiefile"] = cookies
         logging.debug("Using cookies file: %s", cookies)
     else:
@@ -543,20 +738,20 @@ def ydl_opts(cfg: dict, audio_only=True) -> dict:
 # ------------------------------------------------------------------
 def init_history():
     Path("logs").mkdir(exist_ok=True)
-    if not Path(HISTORY_FILE).exists():
-        with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-            json.dump([], f)
+    if not os.path.exists(HISTORY_FILE):
+        with open(HISTORY_FILE, "wb") as f:
+            f.write(_json_dumps([]))
     # ensure index file exists
-    if not Path(HISTORY_INDEX_FILE).exists():
-        with open(HISTORY_INDEX_FILE, "w", encoding="utf-8") as f:
-            json.dump({}, f)
+    if not os.path.exists(HISTORY_INDEX_FILE):
+        with open(HISTORY_INDEX_FILE, "wb") as f:
+            f.write(_json_dumps({}))
 
 
 def load_history() -> List[dict]:
     init_history()
     try:
-        with open(HISTORY_FILE, encoding="utf-8") as f:
-            return json.load(f)
+        with open(HISTORY_FILE, "rb") as f:
+            return _json_loads(f.read())
     except Exception:
         return []
 
@@ -564,38 +759,93 @@ def load_history() -> List[dict]:
 def _load_index() -> dict:
     init_history()
     try:
-        with open(HISTORY_INDEX_FILE, encoding="utf-8") as f:
-            return json.load(f)
+        with open(HISTORY_INDEX_FILE, "rb") as f:
+            return _json_loads(f.read())
     except Exception:
         return {}
 
 
 def _save_index(idx: dict):
     try:
-        with open(HISTORY_INDEX_FILE, "w", encoding="utf-8") as f:
-            json.dump(idx, f, ensure_ascii=False, indent=2)
+        with open(HISTORY_INDEX_FILE, "wb") as f:
+            f.write(_json_dumps(idx))
     except Exception as e:
         logging.debug("Could not write history index: %s", e)
 
 
-def append_history(entry: dict):
-    # update persistent play count index and attach play_count to entry
+def _append_history_batch(entries: List[dict]):
+    # one index and one history rewrite for the whole batch
     idx = _load_index()
-    key = entry.get("track_url") or entry.get("playlist_url") or ""
-    count = idx.get(key, 0) + 1
-    idx[key] = count
-    entry["play_count"] = count
+    for entry in entries:
+        # update persistent play count index and attach play_count to entry
+        key = entry.get("track_url") or entry.get("playlist_url") or ""
+        count = idx.get(key, 0) + 1
+        idx[key] = count
+        entry["play_count"] = count
     _save_index(idx)
 
     h = load_history()
-    h.append(entry)
+    h.extend(entries)
     try:
-        with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-            json.dump(h, f, ensure_ascii=False, indent=2)
+        with open(HISTORY_FILE, "wb") as f:
+            f.write(_json_dumps(h))
     except Exception as e:
         logging.debug("Could not write history: %s", e)
 
 
+class _HistoryWriter:
+    """Write history entries on a background thread, batching bursts."""
+
+    def __init__(self):
+        self._q = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, entry: dict):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="history-writer", daemon=True
+                )
+                self._thread.start()
+        self._q.put(entry)
+
+    def _run(self):
+        while True:
+            batch = [self._q.get()]
+            # take whatever else queued up meanwhile and write it in one go
+            while True:
+                try:
+                    batch.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            entries = [e for e in batch if e is not None]
+            try:
+                if entries:
+                    _append_history_batch(entries)
+            except Exception as e:
+                logging.debug("History writer failed: %s", e)
+            finally:
+                for _ in batch:
+                    self._q.task_done()
+            if len(entries) != len(batch):
+                return
+
+    def flush(self):
+        """Block until every queued entry is on disk."""
+        if self._thread is not None:
+            self._q.join()
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._q.put(None)
+            self._thread.join(timeout=5)
+
+
+_HISTORY = _HistoryWriter()
+atexit.register(_HISTORY.close)
+
+
 def _format_date(ts: Optional[int]) -> str:
     if not ts:
         return "-"
@@ -605,7 +855,11 @@ def _format_date(ts: Optional[int]) -> str:
         return str(ts)
 
 
+_HISTORY_ROW_FMT = "[{idx}] {t:14} {date:20} {title:36} {url:40} {plays:5}\n"
+
+
 def show_history_paged(page_size: int = 10):
+    _HISTORY.flush()
     h = load_history()
     if not h:
         print("No history entries.")
@@ -619,49 +873,55 @@ def show_history_paged(page_size: int = 10):
             return s
         return s[: w - 1] + "…"
 
-    filtered = h
-    total_pages = (len(filtered) + page_size - 1) // page_size if filtered else 1
+    # Lower-cased titles are built once so searches don't re-lower every entry
+    lc_titles = [(x.get("title") or "").lower() for x in h]
+    # Formatted row cells per history index, truncated the first time shown
+    row_cells = {}
+
+    def _cells(i: int) -> dict:
+        cells = row_cells.get(i)
+        if cells is None:
+            item = h[i]
+            cells = row_cells[i] = {
+                "t": (item.get("type") or "?")[:14],
+                "date": _format_date(item.get("timestamp")),
+                "title": _truncate(item.get("title") or "", 36),
+                "url": _truncate(
+                    item.get("track_url") or item.get("playlist_url") or "", 40
+                ),
+                "plays": item.get("play_count") or 1,
+            }
+        return cells
+
     page = 0
     # active filters
     active_type = None
     active_search = None
     while True:
-        start = page * page_size
-        end = start + page_size
-        # re-evaluate filtered list
-        filtered = h
+        # re-evaluate filtered list (as indices into h)
+        filtered = range(len(h))
         if active_type:
-            filtered = [x for x in filtered if (x.get("type") or "") == active_type]
+            filtered = [i for i in filtered if (h[i].get("type") or "") == active_type]
         if active_search:
-            filtered = [
-                x
-                for x in filtered
-                if active_search.lower() in (x.get("title") or "").lower()
-            ]
+            term = active_search.lower()
+            filtered = [i for i in filtered if term in lc_titles[i]]
         total_pages = (len(filtered) + page_size - 1) // page_size if filtered else 1
         start = page * page_size
         end = start + page_size
-        slice_ = filtered[start:end]
-        print(
-            f"History — page {page+1}/{total_pages} (entries {start+1}-{min(end,len(filtered))} of {len(filtered)})"
-        )
-        print(
-            "Idx Type         Date                    Title                               URL                                      Plays"
-        )
-        print(
-            "--- -------------- -------------------- ------------------------------------ ---------------------------------------- -----"
-        )
-        for i, item in enumerate(slice_):
-            idx = i % 10  # 0-9 per page
-            t = (item.get("type") or "?")[:14]
-            date = _format_date(item.get("timestamp"))
-            title = _truncate(item.get("title") or "", 36)
-            url = _truncate(item.get("track_url") or item.get("playlist_url") or "", 40)
-            plays = item.get("play_count") or 1
-            print(f"[{idx}] {t:14} {date:20} {title:36} {url:40} {plays:5}")
-        print(
-            "\nCommands: n=next, p=prev, q=quit, v<num>=view raw (v3), f type=<single|playlist|playlist_entry|...>, s <term>=search title, export [csv|json], clear, help"
+        page_idx = filtered[start:end]
+        slice_ = [h[i] for i in page_idx]
+        lines = [
+            f"History — page {page+1}/{total_pages} (entries {start+1}-{min(end,len(filtered))} of {len(filtered)})\n",
+            "Idx Type         Date                    Title                               URL                                      Plays\n",
+            "--- -------------- -------------------- ------------------------------------ ---------------------------------------- -----\n",
+        ]
+        for i, hi in enumerate(page_idx):
+            # 0-9 per page
+            lines.append(_HISTORY_ROW_FMT.format(idx=i % 10, **_cells(hi)))
+        lines.append(
+            "\nCommands: n=next, p=prev, q=quit, v<num>=view raw (v3), f type=<single|playlist|playlist_entry|...>, s <term>=search title, export [csv|json], clear, help\n"
         )
+        sys.stdout.write("".join(lines))
         cmd = input("history> ").strip().lower()
         if cmd == "n":
             if page + 1 < total_pages:
@@ -709,10 +969,11 @@ def show_history_paged(page_size: int = 10):
             parts = cmd.split()
             fmt = "csv" if len(parts) == 1 else parts[1]
             try:
+                items = [h[i] for i in filtered]
                 if fmt == "csv":
-                    _export_history_csv(filtered)
+                    _export_history_csv(items)
                 else:
-                    _export_history_json(filtered)
+                    _export_history_json(items)
                 print(f"Exported history as {fmt}.")
             except Exception as e:
                 print("Export failed:", e)
@@ -720,11 +981,12 @@ def show_history_paged(page_size: int = 10):
             confirm = input("Clear all history? Type YES to confirm: ")
             if confirm == "YES":
                 try:
-                    with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-                        json.dump([], f)
+                    with open(HISTORY_FILE, "wb") as f:
+                        f.write(_json_dumps([]))
                     _save_index({})
                     h = []
-                    filtered = []
+                    lc_titles = []
+                    row_cells.clear()
                     page = 0
                     print("History cleared.")
                 except Exception as e:
@@ -740,32 +1002,50 @@ def show_history_paged(page_size: int = 10):
 
 
 def _export_history_json(items: List[dict], path: str = "logs/history_export.json"):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(items, f, ensure_ascii=False, indent=2)
+    with open(path, "wb") as f:
+        f.write(_json_dumps(items))
 
 
 def _export_history_csv(items: List[dict], path: str = "logs/history_export.csv"):
     import csv
 
     keys = ["timestamp", "type", "title", "track_url", "playlist_url", "play_count"]
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=keys)
-        w.writeheader()
-        for it in items:
-            row = {k: it.get(k) for k in keys}
-            w.writerow(row)
+    with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+        w = csv.writer(f)
+        w.writerow(keys)
+        w.writerows(
+            (
+                it.get("timestamp"),
+                it.get("type"),
+                it.get("title"),
+                it.get("track_url"),
+                it.get("playlist_url"),
+                it.get("play_count"),
+            )
+            for it in items
+        )
 
 
 # ------------------------------------------------------------------
 # Metadata helpers
 # ------------------------------------------------------------------
-def get_video_info(url: str) -> Optional[dict]:
+@functools.lru_cache(maxsize=256)
+def _extract_video_info(url: str) -> dict:
+    # Failures raise, so lru_cache only ever remembers successful lookups.
+    # Only the fields callers read are kept: a full info dict (formats,
+    # thumbnails, ...) can run to hundreds of KB per entry.
     cfg = load_config()
+    with yt_dlp.YoutubeDL({**ydl_opts(cfg)}) as ydl:
+        info = ydl.extract_info(url, download=False)
+    return {"title": info.get("title"), "duration": info.get("duration")}
+
+
+def get_video_info(url: str) -> Optional[dict]:
+    """Return url's title and duration, memoized so replays and retries reuse it."""
     try:
-        with yt_dlp.YoutubeDL({**ydl_opts(cfg)}) as ydl:
-            info = ydl.extract_info(url, download=False)
-            logging.debug("get_video_info: %s", info)
-            return info
+        info = _extract_video_info(url)
+        logging.debug("get_video_info: %s", info)
+        return info
     except Exception as e:
         logging.debug("get_video_info failed: %s", e)
         return None
@@ -788,19 +1068,42 @@ def _url_to_filename(url: str) -> str:
     return h + ".webm"
 
 
+# yt-dlp's in-progress files and metadata sidecars share the cache stem but
+# are not playable media
+_CACHE_IN_PROGRESS_SUFFIXES = (".part", ".ytdl")
+_CACHE_NON_MEDIA_SUFFIXES = _CACHE_IN_PROGRESS_SUFFIXES + (".json",)
+
+
+def _find_cached(cache_dir: Path, stem: str) -> Optional[Path]:
+    # yt-dlp picks the real extension (.webm, .m4a, ...), so match any of them
+    matches = [
+        p
+        for p in cache_dir.glob(stem + ".*")
+        if p.suffix.lower() not in _CACHE_NON_MEDIA_SUFFIXES
+    ]
+    if not matches:
+        return None
+    return max(matches, key=lambda p: p.stat().st_mtime)
+
+
 def get_cached_file_for_url(url: str, cfg: dict) -> Optional[Path]:
     cache_dir = ensure_cache_dir(cfg)
-    fname = _url_to_filename(url)
-    p = cache_dir / fname
-    if p.exists():
-        return p
-    return None
+    return _find_cached(cache_dir, Path(_url_to_filename(url)).stem)
 
 
 def prune_cache(cfg: dict):
     cache_dir = ensure_cache_dir(cfg)
     max_files = int(cfg.get("CacheMaxFiles", 50))
-    files = sorted(cache_dir.iterdir(), key=lambda p: p.stat().st_atime)
+    # never touch downloads in flight (a prefetch and the foreground download
+    # can run at the same time)
+    files = sorted(
+        (
+            p
+            for p in cache_dir.iterdir()
+            if p.suffix.lower() not in _CACHE_IN_PROGRESS_SUFFIXES
+        ),
+        key=lambda p: p.stat().st_atime,
+    )
     while len(files) > max_files:
         try:
             files[0].unlink()
@@ -809,7 +1112,17 @@ def prune_cache(cfg: dict):
             break
 
 
-def download_to_cache(url: str, cfg: dict, video_mode: bool = False) -> Optional[Path]:
+def download_to_cache(
+    url: str,
+    cfg: dict,
+    video_mode: bool = False,
+    cancel: Optional[threading.Event] = None,
+) -> Optional[Path]:
+    """Download url into the cache and return the file.
+
+    Setting cancel aborts the download at its next progress update (the
+    .part file is kept for a later resume) and returns None.
+    """
     # If already cached, return path
     existing = get_cached_file_for_url(url, cfg)
     force = bool(cfg.get("ForceCacheRefresh", False))
@@ -833,6 +1146,14 @@ def download_to_cache(url: str, cfg: dict, video_mode: bool = False) -> Optional
     cache_dir = ensure_cache_dir(cfg)
     fname = _url_to_filename(url)
     out_path = cache_dir / fname
+    if force:
+        # yt-dlp resumes a leftover .part file by default; a forced refresh
+        # must start from zero instead
+        for partial in cache_dir.glob(out_path.stem + ".*.part"):
+            try:
+                partial.unlink()
+            except Exception as e:
+                logging.debug("Failed to remove partial file %s: %s", partial, e)
     # build yt-dlp options for downloading: ensure skip_download is False
     ydl_opts_local = {**ydl_opts(cfg, audio_only=not video_mode)}
     ydl_opts_local.pop("skip_download", None)
@@ -840,8 +1161,21 @@ def download_to_cache(url: str, cfg: dict, video_mode: bool = False) -> Optional
     stem = out_path.stem
     out_template = str(cache_dir / (stem + ".%(ext)s"))
     ydl_opts_local.update(
-        {"outtmpl": out_template, "format": "best" if video_mode else "bestaudio/best"}
+        {
+            "outtmpl": out_template,
+            "format": "best" if video_mode else "bestaudio/best",
+        }
     )
+    if cancel is not None:
+
+        def _check_cancel(_status):
+            if cancel.is_set():
+                raise yt_dlp.utils.DownloadCancelled()
+
+        ydl_opts_local["progress_hooks"] = [
+            *ydl_opts_local.get("progress_hooks", ()),
+            _check_cancel,
+        ]
     # Use yt_dlp to download directly to the cache path
     # Retry loop with exponential backoff and jitter
     max_retries = int(cfg.get("CacheRetryCount", 3))
@@ -858,10 +1192,7 @@ def download_to_cache(url: str, cfg: dict, video_mode: bool = False) -> Optional
                     attempt + 1,
                 )
                 ydl.download([url])
-            matches = list(cache_dir.glob(stem + ".*"))
-            if matches:
-                matches.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-                real_path = matches[0]
+            real_path = _find_cached(cache_dir, stem)
             prune_cache(cfg)
             if real_path and real_path.exists():
                 logging.info("Downloaded and cached %s -> %s", url, real_path)
@@ -869,14 +1200,15 @@ def download_to_cache(url: str, cfg: dict, video_mode: bool = False) -> Optional
             # if no file found, fallthrough to retry
         except Exception as e:
             logging.debug("download_to_cache attempt %d failed: %s", attempt + 1, e)
+        if cancel is not None and cancel.is_set():
+            logging.debug("Cache download of %s cancelled", url)
+            return None
         # backoff
         attempt += 1
         if attempt > max_retries:
             break
-        import random
-
-        delay = base_delay * (2 ** (attempt - 1))
-        jitter = random.uniform(0, delay * 0.2)
+        delay = base_delay * (1 << (attempt - 1))
+        jitter = random.random() * (delay * 0.2)
         wait = delay + jitter
         logging.debug(
             "Retrying download in %.2fs (attempt %d/%d)",
@@ -884,14 +1216,77 @@ def download_to_cache(url: str, cfg: dict, video_mode: bool = False) -> Optional
             attempt + 1,
             max_retries + 1,
         )
-        time.sleep(wait)
+        if cancel is not None:
+            if cancel.wait(wait):
+                return None
+        else:
+            time.sleep(wait)
     return None
 
 
+class _CachePrefetcher:
+    """Download upcoming tracks into the cache while the current one plays."""
+
+    def __init__(self, cfg: dict, video_mode: bool = False):
+        self.cfg = cfg
+        self.video_mode = video_mode
+        # one worker: prefetches queue up behind each other instead of
+        # competing with the playing track for bandwidth
+        self._pool = ThreadPoolExecutor(max_workers=1)
+        self._pending = {}
+        # the worker thread is joined at interpreter exit, so close() has to
+        # stop a running download rather than just drop the queued ones
+        self._cancel = threading.Event()
+
+    def submit(self, url: Optional[str]):
+        if url and url not in self._pending:
+            logging.debug("Prefetching %s into cache", url)
+            self._pending[url] = self._pool.submit(
+                download_to_cache,
+                url,
+                self.cfg,
+                video_mode=self.video_mode,
+                cancel=self._cancel,
+            )
+
+    def fetch(self, url: str) -> Optional[Path]:
+        """Return the cached file, waiting on a prefetch if one was started."""
+        fut = self._pending.pop(url, None)
+        if fut is not None:
+            try:
+                return fut.result()
+            except Exception as e:
+                logging.debug("Prefetch of %s failed: %s", url, e)
+        return download_to_cache(url, self.cfg, video_mode=self.video_mode)
+
+    def close(self):
+        self._cancel.set()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pending.clear()
+
+
+def _format_duration(seconds) -> str:
+    """H:MM:SS / M:SS like yt-dlp's duration_string, or "?" if unknown."""
+    if not seconds:
+        return "?"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
 def search_yt(query: str, limit: int) -> List[dict]:
     cfg = load_config()
     logging.debug("search_yt called with query='%s', limit=%d", query, limit)
-    opts = {**ydl_opts(cfg), "default_search": f"ytsearch{limit}"}
+    # Flat search returns the result list in one request, and its entries
+    # already carry title, channel and duration. Only the picked entries are
+    # resolved further, when they play.
+    opts = {
+        **ydl_opts(cfg),
+        "default_search": f"ytsearch{limit}",
+        "extract_flat": "in_playlist",
+    }
     logging.debug("yt-dlp search options: %s", opts)
     with yt_dlp.YoutubeDL(opts) as ydl:
         try:
@@ -900,7 +1295,7 @@ def search_yt(query: str, limit: int) -> List[dict]:
         except Exception as e:
             logging.error("Search failed – %s", e)
             return []
-    entries = info.get("entries") or []
+    entries = [e for e in info.get("entries") or [] if e]
     logging.debug("Found %d entries", len(entries))
     return entries
 
@@ -921,6 +1316,25 @@ def extract_stream_url(video_url: str) -> Optional[str]:
 # ------------------------------------------------------------------
 # Playback
 # ------------------------------------------------------------------
+# Players get their own process group so quitting can signal the whole
+# tree (mpv/ffplay helpers, the yt-dlp feeding a pipe) instead of the leader.
+if IS_WINDOWS:
+    _NEW_GROUP_KW = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    _NEW_GROUP_KW = {"start_new_session": True}
+
+# Players outside the terminal's foreground group never see its Ctrl-C or
+# hangup, so cleanup_on_exit() stops whichever of these are still running.
+_LIVE_PLAYERS: "weakref.WeakSet[subprocess.Popen]" = weakref.WeakSet()
+
+
+def _spawn_player(cmd: List[str], **kwargs) -> subprocess.Popen:
+    """Popen in a new process group, remembered for cleanup_on_exit()."""
+    proc = subprocess.Popen(cmd, **kwargs, **_NEW_GROUP_KW)
+    _LIVE_PLAYERS.add(proc)
+    return proc
+
+
 def play_stream(url: str, silent=True, video_mode=False) -> subprocess.Popen:
     """
     Play content based on mode and method:
@@ -943,29 +1357,23 @@ def play_stream(url: str, silent=True, video_mode=False) -> subprocess.Popen:
 
     # If the caller already provided a local cached file path, play it directly
     # instead of treating it as a URL (which would cause yt-dlp to error).
-    try:
-        p = Path(url)
-    except Exception:
-        p = None
-    if p and p.exists():
-        local_path = str(p)
+    # http(s) URLs are never local files, so skip the stat() for them.
+    if not is_url(url) and os.path.exists(url):
+        local_path = url
         logging.debug(
             "play_stream: detected local file path, playing directly: %s", local_path
         )
         if video_mode:
             # Play local video file with mpv
-            mpv_cmd = [
-                "mpv",
-                local_path,
-                "--force-window",
-                "--no-terminal" if silent else None,
-                "--msg-level=all=no" if silent else None,
-            ]
-            mpv_cmd = [c for c in mpv_cmd if c is not None]
-            logging.debug("mpv cmd (local file): %s", " ".join(mpv_cmd))
+            mpv_cmd = ["mpv", local_path, "--force-window"]
+            if silent:
+                mpv_cmd += ("--no-terminal", "--msg-level=all=no")
+            logging.debug("mpv cmd (local file): %s", _LazyJoin(mpv_cmd))
             try:
-                proc = subprocess.Popen(
-                    mpv_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                proc = _spawn_player(
+                    mpv_cmd,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
                 )
                 track_player_state(proc, url, "local_video")
                 logging.info("Playing local video file: %s", local_path)
@@ -979,15 +1387,17 @@ def play_stream(url: str, silent=True, video_mode=False) -> subprocess.Popen:
             # Play local audio file with ffplay
             ffplay_cmd = [
                 "ffplay",
+                "-hide_banner",
+                "-nostats",
                 "-nodisp",
                 "-autoexit",
                 "-loglevel",
                 "info" if not silent else "quiet",
                 local_path,
             ]
-            logging.debug("ffplay cmd (local file): %s", " ".join(ffplay_cmd))
+            logging.debug("ffplay cmd (local file): %s", _LazyJoin(ffplay_cmd))
             try:
-                proc = subprocess.Popen(ffplay_cmd, stdin=subprocess.DEVNULL)
+                proc = _spawn_player(ffplay_cmd, stdin=subprocess.DEVNULL)
                 track_player_state(proc, url, "local_audio")
                 logging.info("Playing local audio file: %s", local_path)
                 return proc
@@ -1002,7 +1412,7 @@ def play_stream(url: str, silent=True, video_mode=False) -> subprocess.Popen:
         play_path = url
         if method == "cache":
             # For cached files, we already have the file path
-            if Path(url).exists():  # If url is actually a local file path
+            if os.path.exists(url):  # If url is actually a local file path
                 play_path = url
             else:
                 # Otherwise download to cache
@@ -1012,29 +1422,28 @@ def play_stream(url: str, silent=True, video_mode=False) -> subprocess.Popen:
                     return None
                 play_path = str(filepath)
 
+        # stat() each path once and reuse the results below
+        is_local_file = os.path.isfile(play_path)
+        cookies = cfg.get("CookiesFile", COOKIES_FILE)
+        has_cookies = os.path.isfile(cookies)
+
         # Construct mpv command
-        mpv_cmd = [
-            "mpv",
-            play_path,
-            "--force-window",
-            "--no-terminal" if silent else None,
-            "--msg-level=all=no" if silent else None,
-        ]
+        mpv_cmd = ["mpv", play_path, "--force-window"]
+        if silent:
+            mpv_cmd += ("--no-terminal", "--msg-level=all=no")
         # Add cookies only for URLs, not local files
-        if not Path(play_path).exists():
-            cookies = cfg.get("CookiesFile", COOKIES_FILE)
-            if Path(cookies).exists():
-                mpv_cmd.append(f"--cookies-file={cookies}")
-
-        mpv_cmd = [c for c in mpv_cmd if c is not None]
-        logging.debug("mpv cmd: %s", " ".join(mpv_cmd))
+        if has_cookies and not is_local_file:
+            mpv_cmd.append(f"--cookies-file={cookies}")
+        logging.debug("mpv cmd: %s", _LazyJoin(mpv_cmd))
 
         try:
-            proc = subprocess.Popen(
-                mpv_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            proc = _spawn_player(
+                mpv_cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
             )
             logging.debug("mpv process started, pid=%s", proc.pid)
-            if Path(play_path).exists():
+            if is_local_file:
                 logging.info("Playing video from cache: %s", play_path)
             else:
                 logging.info("Playing video via mpv: %s", play_path)
@@ -1044,21 +1453,18 @@ def play_stream(url: str, silent=True, video_mode=False) -> subprocess.Popen:
             return None
         else:
             # Pipe mode: Let mpv handle everything - pass URL directly
-            cookies = cfg.get("CookiesFile", COOKIES_FILE)
-            mpv_cmd = [
-                "mpv",
-                url,
-                "--force-window",
-                "--no-terminal" if silent else None,
-                "--msg-level=all=no" if silent else None,
-                f"--cookies-file={cookies}" if Path(cookies).exists() else None,
-            ]
-            mpv_cmd = [c for c in mpv_cmd if c is not None]
+            mpv_cmd = ["mpv", url, "--force-window"]
+            if silent:
+                mpv_cmd += ("--no-terminal", "--msg-level=all=no")
+            if has_cookies:
+                mpv_cmd.append(f"--cookies-file={cookies}")
 
-            logging.debug("mpv cmd (direct): %s", " ".join(mpv_cmd))
+            logging.debug("mpv cmd (direct): %s", _LazyJoin(mpv_cmd))
             try:
-                proc = subprocess.Popen(
-                    mpv_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                proc = _spawn_player(
+                    mpv_cmd,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
                 )
                 logging.debug("mpv process started (direct), pid=%s", proc.pid)
                 logging.info("Playing video via mpv: %s", url)
@@ -1077,14 +1483,16 @@ def play_stream(url: str, silent=True, video_mode=False) -> subprocess.Popen:
                 return None
             ffplay_cmd = [
                 "ffplay",
+                "-hide_banner",
+                "-nostats",
                 "-nodisp",
                 "-autoexit",
                 "-loglevel",
                 "info" if not silent else "quiet",
                 str(filepath),
             ]
-            logging.debug("ffplay cmd (cache): %s", " ".join(ffplay_cmd))
-            proc = subprocess.Popen(ffplay_cmd, stdin=subprocess.DEVNULL)
+            logging.debug("ffplay cmd (cache): %s", _LazyJoin(ffplay_cmd))
+            proc = _spawn_player(ffplay_cmd, stdin=subprocess.DEVNULL)
             logging.debug("ffplay process started from cache, pid=%s", proc.pid)
             logging.info("Playing from cache: %s", filepath)
             return proc
@@ -1102,10 +1510,20 @@ def play_stream(url: str, silent=True, video_mode=False) -> subprocess.Popen:
             url,
         ]
         cookies = cfg.get("CookiesFile", COOKIES_FILE)
-        if Path(cookies).exists():
+        if os.path.isfile(cookies):
             ytdlp_cmd += ["--cookies", cookies]
+        # the stream is already demuxable from its first bytes; skip ffplay's
+        # default probing/buffering so audio starts as soon as data arrives
         ffplay_cmd = [
             "ffplay",
+            "-hide_banner",
+            "-nostats",
+            "-fflags",
+            "nobuffer",
+            "-probesize",
+            "32",
+            "-analyzeduration",
+            "0",
             "-i",
             "-",
             "-nodisp",
@@ -1113,18 +1531,36 @@ def play_stream(url: str, silent=True, video_mode=False) -> subprocess.Popen:
             "-loglevel",
             "info" if not silent else "quiet",
         ]
-        logging.debug("yt-dlp cmd: %s", " ".join(ytdlp_cmd))
-        logging.debug("ffplay cmd: %s", " ".join(ffplay_cmd))
+        logging.debug("yt-dlp cmd: %s", _LazyJoin(ytdlp_cmd))
+        logging.debug("ffplay cmd: %s", _LazyJoin(ffplay_cmd))
         try:
-            ytdlp_proc = subprocess.Popen(
-                ytdlp_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            ytdlp_proc = _spawn_player(
+                ytdlp_cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
             )
-            ffplay_proc = subprocess.Popen(
+            if sys.platform.startswith("linux"):
+                # A 1 MiB pipe (default 64 KiB) lets yt-dlp write ahead in big
+                # chunks with fewer wakeups on either side.
+                try:
+                    fcntl.fcntl(
+                        ytdlp_proc.stdout.fileno(),
+                        getattr(fcntl, "F_SETPIPE_SZ", 1031),
+                        1 << 20,
+                    )
+                except OSError as e:
+                    logging.debug("F_SETPIPE_SZ failed: %s", e)
+            ffplay_proc = _spawn_player(
                 ffplay_cmd,
                 stdin=ytdlp_proc.stdout,
                 stdout=subprocess.DEVNULL,
                 stderr=None,
             )
+            # ffplay holds its own copy of the read end; dropping ours means it
+            # sees EOF (and yt-dlp sees EPIPE) as soon as the other side exits
+            ytdlp_proc.stdout.close()
+            # let _kill_tree() stop the producer together with the player
+            ffplay_proc.ytdlp_proc = ytdlp_proc
             logging.debug(
                 "yt-dlp pid=%s, ffplay pid=%s", ytdlp_proc.pid, ffplay_proc.pid
             )
@@ -1135,6 +1571,177 @@ def play_stream(url: str, silent=True, video_mode=False) -> subprocess.Popen:
             return None
 
 
+def _kill_tree(proc: subprocess.Popen):
+    """Stop a player from play_stream() along with its process group."""
+    procs = [p for p in (proc, getattr(proc, "ytdlp_proc", None)) if p is not None]
+    for p in procs:
+        if p.poll() is not None:
+            continue
+        try:
+            if IS_WINDOWS:
+                p.send_signal(signal.CTRL_BREAK_EVENT)
+            else:
+                # started with start_new_session, so pgid == pid
+                os.killpg(p.pid, signal.SIGTERM)
+        except (OSError, ValueError):
+            p.terminate()
+    for p in procs:
+        try:
+            p.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            logging.debug("pid=%s ignored SIGTERM, killing", p.pid)
+            p.kill()
+
+
+@contextlib.contextmanager
+def _cbreak_stdin():
+    """Put a POSIX terminal in cbreak mode so keys arrive without Enter."""
+    if IS_WINDOWS or not sys.stdin.isatty():
+        yield
+        return
+    fd = sys.stdin.fileno()
+    old_attrs = termios.tcgetattr(fd)
+    try:
+        tty.setcbreak(fd)
+        yield
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, old_attrs)
+
+
+def _player_exit_fd(player: subprocess.Popen) -> int:
+    """Return a fd that turns readable once player exits (opened once per player)."""
+    rfd = getattr(player, "_exit_rfd", None)
+    if rfd is None:
+        rfd, wfd = os.pipe()
+
+        def _notify():
+            try:
+                player.wait()
+            finally:
+                # closing the write end leaves rfd readable (EOF) for good
+                os.close(wfd)
+
+        threading.Thread(target=_notify, name="player-exit", daemon=True).start()
+        weakref.finalize(player, os.close, rfd)
+        player._exit_rfd = rfd
+    return rfd
+
+
+# Set once stdin hits EOF or turns out not to be pollable (/dev/null, a file);
+# an always-readable stdin would otherwise turn the key wait into a busy loop.
+_NO_STDIN_KEYS = False
+
+
+def _wait_for_event_posix(
+    player: subprocess.Popen, timeout: Optional[float], keys: bool
+) -> Optional[str]:
+    global _NO_STDIN_KEYS
+    sel = selectors.DefaultSelector()
+    pidfd = None
+    try:
+        if keys and not _NO_STDIN_KEYS:
+            try:
+                sel.register(sys.stdin, selectors.EVENT_READ)
+            except (OSError, ValueError):
+                _NO_STDIN_KEYS = True
+        # A pidfd becomes readable as soon as the player exits (Linux, Py3.9+);
+        # elsewhere a waiter thread signals the same through a pipe.
+        try:
+            pidfd = os.pidfd_open(player.pid)
+            sel.register(pidfd, selectors.EVENT_READ)
+        except (AttributeError, OSError):
+            pidfd = None
+            sel.register(_player_exit_fd(player), selectors.EVENT_READ)
+        for key, _ in sel.select(timeout):
+            if key.fileobj is sys.stdin:
+                # Read the raw fd: going through sys.stdin's buffered text layer
+                # can pull extra bytes that select() then no longer sees.
+                data = os.read(sys.stdin.fileno(), 1)
+                if not data:
+                    _NO_STDIN_KEYS = True
+                return data.decode("ascii", "ignore").lower() or None
+        return None
+    finally:
+        sel.close()
+        if pidfd is not None:
+            os.close(pidfd)
+
+
+def _wait_for_event_windows(
+    player: subprocess.Popen, timeout: Optional[float], keys: bool
+) -> Optional[str]:
+    kernel32 = ctypes.windll.kernel32
+    ms = 0xFFFFFFFF if timeout is None else int(timeout * 1000)  # INFINITE
+    # a redirected stdin (pipe/file) handle is always signalled, which would
+    # turn the wait below into a busy loop; only a console delivers keys
+    if not keys or not sys.stdin.isatty():
+        kernel32.WaitForSingleObject(ctypes.c_void_p(int(player._handle)), ms)
+        return None
+    stdin_handle = msvcrt.get_osfhandle(sys.stdin.fileno())
+    handles = (ctypes.c_void_p * 2)(int(player._handle), stdin_handle)
+    # WAIT_OBJECT_0 + 1 means the console input handle was signalled
+    rc = kernel32.WaitForMultipleObjects(2, handles, False, ms)
+    if msvcrt.kbhit():
+        return msvcrt.getwch().lower()
+    if rc == 1:
+        # Mouse/focus/key-up events also signal the handle; drop them so the
+        # next wait blocks instead of returning immediately.
+        kernel32.FlushConsoleInputBuffer(ctypes.c_void_p(stdin_handle))
+    return None
+
+
+def wait_for_event(
+    player: subprocess.Popen, timeout: Optional[float], keys: bool = True
+) -> Optional[str]:
+    """Block until a key is pressed, the player exits, or timeout seconds pass.
+
+    Returns the lower-cased key that was pressed, or None. With keys=False
+    stdin is left alone and only player exit (or the timeout) wakes us up.
+    A timeout of None waits indefinitely.
+    """
+    return _wait_for_event(player, timeout, keys)
+
+
+_wait_for_event = _wait_for_event_windows if IS_WINDOWS else _wait_for_event_posix
+
+
+def _timed_input(prompt: str, timeout: float) -> Optional[str]:
+    """Print prompt and read a line, or return None after timeout seconds."""
+    global _NO_STDIN_KEYS
+    print(prompt)
+    if IS_WINDOWS:
+        if not sys.stdin.isatty():
+            # console key checks can't see redirected input; auto-advance
+            return None
+        kernel32 = ctypes.windll.kernel32
+        stdin_handle = ctypes.c_void_p(msvcrt.get_osfhandle(sys.stdin.fileno()))
+        deadline = time.monotonic() + timeout
+        while not msvcrt.kbhit():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            # WAIT_OBJECT_0: console input arrived
+            if kernel32.WaitForSingleObject(stdin_handle, int(remaining * 1000)):
+                return None
+            if not msvcrt.kbhit():
+                # mouse/focus/key-up events; drop them and keep waiting
+                kernel32.FlushConsoleInputBuffer(stdin_handle)
+    elif not _NO_STDIN_KEYS:
+        with selectors.DefaultSelector() as sel:
+            try:
+                sel.register(sys.stdin, selectors.EVENT_READ)
+            except (OSError, ValueError):
+                # a regular file or /dev/null: reading it never blocks anyway
+                _NO_STDIN_KEYS = True
+            else:
+                if not sel.select(timeout):
+                    return None
+    try:
+        return input().strip().lower()
+    except EOFError:
+        return None
+
+
 def interactive_play(
     entries: List[dict], cfg: dict, playlist_url: Optional[str] = None, video_mode=False
 ):
@@ -1145,177 +1752,164 @@ def interactive_play(
     )
     idx = 0
     retry = 3
-    while 0 <= idx < len(entries):
-        logging.debug("Playlist index: %d", idx)
-        e = entries[idx]
-        title = e.get("title") or "Unknown"
-        webpage_url = e.get("webpage_url") or e.get("url")
-        logging.debug("Now playing entry: %s, url: %s", title, webpage_url)
-        print(f"\nNow playing: [{idx+1}/{len(entries)}] {title}")
-        logging.info(
-            "Now playing playlist entry %d/%d: %s", idx + 1, len(entries), title
-        )
-        retry_count = 0
-        # Record playlist entry in history (playlist-level)
-        try:
-            append_history(
-                {
-                    "type": "playlist_entry",
-                    "playlist_url": playlist_url,
-                    "track_url": webpage_url,
-                    "title": title,
-                    "timestamp": int(time.time()),
-                }
+    prefetch = (
+        _CachePrefetcher(cfg, video_mode=video_mode)
+        if cfg.get("PlaybackMethod") == "cache"
+        else None
+    )
+    try:
+        while 0 <= idx < len(entries):
+            logging.debug("Playlist index: %d", idx)
+            e = entries[idx]
+            title = e.get("title") or "Unknown"
+            webpage_url = e.get("webpage_url") or e.get("url")
+            logging.debug("Now playing entry: %s, url: %s", title, webpage_url)
+            print(f"\nNow playing: [{idx+1}/{len(entries)}] {title}")
+            logging.info(
+                "Now playing playlist entry %d/%d: %s", idx + 1, len(entries), title
             )
-        except Exception:
-            pass
-        while retry_count < 3:
-            # try to get duration from metadata and try cache first
-            info = get_video_info(webpage_url)
-            duration = None
-            if info:
-                duration = info.get("duration")
-            # Determine if we should use cache or direct streaming
-            play_url = webpage_url
-            if cfg.get("PlaybackMethod") == "cache":
-                filepath = download_to_cache(webpage_url, cfg, video_mode=video_mode)
-                if not filepath:
-                    print("  Failed to download to cache.")
-                    logging.info("Cache download failed for %s", title)
+            retry_count = 0
+            # Record playlist entry in history (playlist-level)
+            try:
+                _HISTORY.enqueue(
+                    {
+                        "type": "playlist_entry",
+                        "playlist_url": playlist_url,
+                        "track_url": webpage_url,
+                        "title": title,
+                        "timestamp": int(time.time()),
+                    }
+                )
+            except Exception:
+                pass
+            # Flat playlist entries usually carry the duration already; only fall
+            # back to a metadata lookup (once, not per retry) when they don't.
+            duration = e.get("duration")
+            if duration is None:
+                info = get_video_info(webpage_url)
+                if info:
+                    duration = info.get("duration")
+            while retry_count < 3:
+                # Determine if we should use cache or direct streaming
+                play_url = webpage_url
+                if prefetch:
+                    filepath = prefetch.fetch(webpage_url)
+                    if not filepath:
+                        print("  Failed to download to cache.")
+                        logging.info("Cache download failed for %s", title)
+                        idx += 1
+                        break
+                    play_url = str(filepath)  # Use the cached file path
+                player = play_stream(
+                    play_url, silent=not cfg.get("Debug", False), video_mode=video_mode
+                )
+                if player is None:
+                    print("  Failed to start player.")
+                    logging.info("Player failed to start for %s", title)
                     idx += 1
                     break
-                play_url = str(filepath)  # Use the cached file path
-            player = play_stream(
-                play_url, silent=not cfg.get("Debug", False), video_mode=video_mode
-            )
-            if player is None:
-                print("  Failed to start player.")
-                logging.info("Player failed to start for %s", title)
-                idx += 1
-                break
-            print("  Controls: [n]ext, [r]eplay, [q]uit")
-            logging.debug("Displayed controls to user")
-            logging.debug("Player started for entry: %s", title)
-            user_action = None
-            start_ts = time.time()
-            try:
-                while player.poll() is None:
-                    if platform.system() == "Windows":
-                        import msvcrt
-
-                        if msvcrt.kbhit():
-                            ch = msvcrt.getch().decode().lower()
-                            logging.debug("User pressed key: %s", ch)
-                            if ch == "n":
-                                logging.debug("User requested next track.")
-                                player.terminate()
-                                user_action = "next"
-                                break
-                            elif ch == "r":
-                                logging.debug("User requested replay.")
-                                player.terminate()
-                                user_action = "replay"
-                                break
-                            elif ch == "q":
-                                logging.debug("User requested quit.")
-                                player.terminate()
-                                return
-                    else:
-                        import select
-
-                        if select.select([sys.stdin], [], [], 0)[0]:
-                            ch = sys.stdin.read(1).lower()
-                            logging.debug("User pressed key: %s", ch)
+                if prefetch and idx + 1 < len(entries):
+                    nxt = entries[idx + 1]
+                    prefetch.submit(nxt.get("webpage_url") or nxt.get("url"))
+                print("  Controls: [n]ext, [r]eplay, [q]uit")
+                logging.debug("Displayed controls to user")
+                logging.debug("Player started for entry: %s", title)
+                user_action = None
+                start_ts = time.time()
+                try:
+                    with _cbreak_stdin():
+                        while player.poll() is None:
+                            # Wakes on a keypress or player exit; the timeout only
+                            # refreshes the elapsed-time line.
+                            ch = wait_for_event(player, 1.0)
+                            if ch:
+                                logging.debug("User pressed key: %s", ch)
                             if ch == "n":
                                 logging.debug("User requested next track.")
-                                player.terminate()
+                                _kill_tree(player)
                                 user_action = "next"
                                 break
                             elif ch == "r":
                                 logging.debug("User requested replay.")
-                                player.terminate()
+                                _kill_tree(player)
                                 user_action = "replay"
                                 break
                             elif ch == "q":
                                 logging.debug("User requested quit.")
-                                player.terminate()
+                                _kill_tree(player)
                                 return
-                    # Only show elapsed time in audio mode
-                    if not video_mode:
-                        elapsed = int(time.time() - start_ts)
-                        if duration:
-                            total = int(duration)
-                            sys.stdout.write(f"\rElapsed: {elapsed}s / {total}s ")
-                        else:
-                            sys.stdout.write(f"\rElapsed: {elapsed}s")
-                        sys.stdout.flush()
-                    time.sleep(0.1)  # More responsive controls
-            except KeyboardInterrupt:
-                logging.debug("KeyboardInterrupt: terminating player.")
-                player.terminate()
-                return
-            exit_code = player.wait()
-            # Clear player state after graceful exit
-            untrack_player_state()
-            # clear elapsed line in audio mode
-            if not video_mode:
-                try:
-                    sys.stdout.write("\r" + " " * 60 + "\r")
-                except Exception:
-                    pass
-            logging.debug("Player exited with code: %s", exit_code)
-            # If abnormal exit, retry up to 2 more times
-            if exit_code != 0 and user_action is None:
-                retry_count += 1
-                print(
-                    f"  Player exited abnormally (code {exit_code}), retrying ({retry_count}/3)..."
-                )
-                logging.warning(
-                    "Player exited abnormally (code %s), retrying (%d/3)...",
-                    exit_code,
-                    retry_count,
-                )
-                continue
-            # If user requested replay, loop again
-            if user_action == "replay":
-                retry_count = 0
-                continue
-            # If user requested next, advance
-            if user_action == "next":
-                idx += 1
-                break
-            # If track ended naturally, prompt user for 3 seconds
-            print("Track ended. [n]ext, [r]eplay, [q]uit? (auto-next in 3s)")
-            logging.debug("Track ended, waiting for user action (3s timeout).")
-            import threading
-
-            user_input = {"ch": None}
-
-            def get_input():
-                user_input["ch"] = input().strip().lower()
-
-            t = threading.Thread(target=get_input)
-            t.daemon = True
-            t.start()
-            t.join(3)
-            ch = user_input["ch"]
-            if ch is None:
-                print("No input, auto-advancing to next track.")
-                idx += 1
-                break
-            if ch == "n":
-                idx += 1
-                break
-            elif ch == "r":
-                retry_count = 0
-                continue
-            elif ch == "q":
-                return
-            else:
-                print("Invalid input. [n]ext, [r]eplay, [q]uit?")
-                # fallback: auto-advance
-                idx += 1
-                break
+                            # Only show elapsed time in audio mode
+                            if not video_mode:
+                                elapsed = int(time.time() - start_ts)
+                                if duration:
+                                    total = int(duration)
+                                    sys.stdout.write(
+                                        f"\rElapsed: {elapsed}s / {total}s "
+                                    )
+                                else:
+                                    sys.stdout.write(f"\rElapsed: {elapsed}s")
+                                sys.stdout.flush()
+                except KeyboardInterrupt:
+                    logging.debug("KeyboardInterrupt: terminating player.")
+                    _kill_tree(player)
+                    return
+                exit_code = player.wait()
+                # Clear player state after graceful exit
+                untrack_player_state()
+                # clear elapsed line in audio mode
+                if not video_mode:
+                    try:
+                        sys.stdout.write("\r" + " " * 60 + "\r")
+                    except Exception:
+                        pass
+                logging.debug("Player exited with code: %s", exit_code)
+                # If abnormal exit, retry up to 2 more times
+                if exit_code != 0 and user_action is None:
+                    retry_count += 1
+                    print(
+                        f"  Player exited abnormally (code {exit_code}), retrying ({retry_count}/3)..."
+                    )
+                    logging.warning(
+                        "Player exited abnormally (code %s), retrying (%d/3)...",
+                        exit_code,
+                        retry_count,
+                    )
+                    continue
+                # If user requested replay, loop again
+                if user_action == "replay":
+                    retry_count = 0
+                    continue
+                # If user requested next, advance
+                if user_action == "next":
+                    idx += 1
+                    break
+                # If track ended naturally, prompt user for 3 seconds
+                logging.debug("Track ended, waiting for user action (3s timeout).")
+                ch = _timed_input(
+                    "Track ended. [n]ext, [r]eplay, [q]uit? (auto-next in 3s)", 3.0
+                )
+                if ch is None:
+                    print("No input, auto-advancing to next track.")
+                    idx += 1
+                    break
+                if ch == "n":
+                    idx += 1
+                    break
+                elif ch == "r":
+                    retry_count = 0
+                    continue
+                elif ch == "q":
+                    return
+                else:
+                    print("Invalid input. [n]ext, [r]eplay, [q]uit?")
+                    # fallback: auto-advance
+                    idx += 1
+                    break
+    finally:
+        if prefetch:
+            prefetch.close()
+    # Metadata for this playlist is no longer needed once it has finished
+    _extract_video_info.cache_clear()
     print("End of playlist.")
     logging.info("End of playlist")
 
@@ -1323,12 +1917,16 @@ def interactive_play(
 # ------------------------------------------------------------------
 # Input handler
 # ------------------------------------------------------------------
+_URL_RE = re.compile(r"https?://")
+_PLAYLIST_RE = re.compile(r"playlist|list=")
+
+
 def is_url(text: str) -> bool:
-    return text.startswith("http://") or text.startswith("https://")
+    return _URL_RE.match(text) is not None
 
 
 def is_playlist(url: str) -> bool:
-    return "playlist" in url or "list=" in url
+    return _PLAYLIST_RE.search(url) is not None
 
 
 def handle_input(raw: str, cfg: dict, video_mode=False):
@@ -1359,10 +1957,11 @@ def handle_input(raw: str, cfg: dict, video_mode=False):
                 "Now playing single %s: %s", "video" if video_mode else "audio", raw
             )
             # record history (include title from metadata when available)
+            info = None
             try:
                 info = get_video_info(raw)
                 title = info.get("title") if info else None
-                append_history(
+                _HISTORY.enqueue(
                     {
                         "type": "single",
                         "playlist_url": None,
@@ -1373,10 +1972,8 @@ def handle_input(raw: str, cfg: dict, video_mode=False):
                 )
             except Exception:
                 pass
+            duration = info.get("duration") if info else None
             while True:
-                # ensure we have metadata for duration display
-                info = info if "info" in locals() else get_video_info(raw)
-                duration = info.get("duration") if info else None
                 # Determine if we should use cache or direct streaming
                 play_url = raw
                 if cfg.get("PlaybackMethod") == "cache":
@@ -1396,50 +1993,34 @@ def handle_input(raw: str, cfg: dict, video_mode=False):
                 user_action = None
                 try:
                     start_ts = time.time()
-                    while player.poll() is None:
-                        if platform.system() == "Windows":
-                            import msvcrt
-
-                            if msvcrt.kbhit():
-                                ch = msvcrt.getch().decode().lower()
+                    with _cbreak_stdin():
+                        while player.poll() is None:
+                            ch = wait_for_event(player, 1.0)
+                            if ch:
                                 logging.debug("User pressed key: %s", ch)
-                                if ch == "r":
-                                    logging.debug("User requested replay.")
-                                    player.terminate()
-                                    user_action = "replay"
-                                    break
-                                elif ch == "q":
-                                    logging.debug("User requested quit.")
-                                    player.terminate()
-                                    return
-                        else:
-                            import select
-
-                            if select.select([sys.stdin], [], [], 0)[0]:
-                                ch = sys.stdin.read(1).lower()
-                                logging.debug("User pressed key: %s", ch)
-                                if ch == "r":
-                                    logging.debug("User requested replay.")
-                                    player.terminate()
-                                    user_action = "replay"
-                                    break
-                                elif ch == "q":
-                                    logging.debug("User requested quit.")
-                                    player.terminate()
-                                    return
-                        # In video mode, don't show elapsed time since mpv has its own OSD
-                        if not video_mode:
-                            elapsed = int(time.time() - start_ts)
-                            if duration:
-                                total = int(duration)
-                                sys.stdout.write(f"\rElapsed: {elapsed}s / {total}s ")
-                            else:
-                                sys.stdout.write(f"\rElapsed: {elapsed}s")
-                            sys.stdout.flush()
-                        time.sleep(0.1)  # Shorter sleep for more responsive controls
+                            if ch == "r":
+                                logging.debug("User requested replay.")
+                                _kill_tree(player)
+                                user_action = "replay"
+                                break
+                            elif ch == "q":
+                                logging.debug("User requested quit.")
+                                _kill_tree(player)
+                                return
+                            # In video mode, don't show elapsed time since mpv has its own OSD
+                            if not video_mode:
+                                elapsed = int(time.time() - start_ts)
+                                if duration:
+                                    total = int(duration)
+                                    sys.stdout.write(
+                                        f"\rElapsed: {elapsed}s / {total}s "
+                                    )
+                                else:
+                                    sys.stdout.write(f"\rElapsed: {elapsed}s")
+                                sys.stdout.flush()
                 except KeyboardInterrupt:
                     logging.debug("KeyboardInterrupt: terminating player.")
-                    player.terminate()
+                    _kill_tree(player)
                     return
                 # Clear elapsed line in audio mode
                 if not video_mode:
@@ -1479,31 +2060,75 @@ def handle_input(raw: str, cfg: dict, video_mode=False):
         for i, v in enumerate(results, 1):
             title = v.get("title") or "Unknown"
             channel = v.get("channel") or v.get("uploader") or "Unknown"
-            duration = v.get("duration_string") or "?"
+            duration = v.get("duration_string") or _format_duration(v.get("duration"))
             logging.debug("Result %d: %s | %s | %s", i, title, channel, duration)
             print(f"[{i}] {title} | {channel} | {duration}")
-        try:
-            chosen = input(
-                "\nSelect by number (space for multiple), or 0 to cancel: "
-            ).strip()
-            logging.debug("User selection: %s", chosen)
-            if chosen == "0":
-                return
-            indices = [int(x) - 1 for x in chosen.split()]
-            selected = [results[i] for i in indices if 0 <= i < len(results)]
-            logging.debug("Selected indices: %s", indices)
-            if selected:
-                logging.debug("Selected entries: %s", selected)
-                interactive_play(selected, cfg, playlist_url=None)
-        except (ValueError, IndexError):
+        chosen = input(
+            "\nSelect by number (space for multiple), or 0 to cancel: "
+        ).strip()
+        logging.debug("User selection: %s", chosen)
+        if chosen == "0":
+            return
+        # skip bad tokens individually so one typo doesn't drop valid picks
+        selected = []
+        n = len(results)
+        for tok in chosen.split():
+            try:
+                i = int(tok) - 1
+            except ValueError:
+                logging.debug("Ignoring invalid selection token: %s", tok)
+                continue
+            if 0 <= i < n:
+                selected.append(results[i])
+        if selected:
+            logging.debug("Selected entries: %s", selected)
+            interactive_play(selected, cfg, playlist_url=None)
+        elif chosen:
             logging.debug("Invalid selection input.")
             print("Invalid selection.")
 
 
+# Idle flat-extraction YoutubeDL instances, keyed by their options. Building
+# one loads extractors and the cookie jar; a checked-out instance is only
+# used by one thread, so concurrent expansions never share one.
+_FLAT_YDL_POOL = {}
+_FLAT_YDL_LOCK = threading.Lock()
+
+
+@contextlib.contextmanager
+def _flat_ydl(cfg: dict):
+    opts = {**ydl_opts(cfg), "extract_flat": "in_playlist"}
+    key = tuple(sorted(opts.items()))
+    with _FLAT_YDL_LOCK:
+        idle = _FLAT_YDL_POOL.setdefault(key, [])
+        ydl = idle.pop() if idle else None
+    if ydl is None:
+        ydl = yt_dlp.YoutubeDL(opts)
+    try:
+        yield ydl
+    finally:
+        with _FLAT_YDL_LOCK:
+            idle.append(ydl)
+
+
+def _close_flat_ydls():
+    with _FLAT_YDL_LOCK:
+        for idle in _FLAT_YDL_POOL.values():
+            for ydl in idle:
+                try:
+                    ydl.close()
+                except Exception:
+                    pass
+        _FLAT_YDL_POOL.clear()
+
+
+atexit.register(_close_flat_ydls)
+
+
 def playlist_to_entries(playlist_url: str) -> List[dict]:
     cfg = load_config()
     logging.debug("playlist_to_entries called for: %s", playlist_url)
-    with yt_dlp.YoutubeDL({**ydl_opts(cfg), "extract_flat": "in_playlist"}) as ydl:
+    with _flat_ydl(cfg) as ydl:
         try:
             info = ydl.extract_info(playlist_url, download=False)
             logging.debug("Playlist extract_info result: %s", info)
@@ -1519,11 +2144,16 @@ def list_playlist_files(folder: str = "playlists") -> List[Path]:
     """
     p = Path(folder)
     p.mkdir(parents=True, exist_ok=True)
-    files = [
-        f
-        for f in sorted(p.iterdir())
-        if f.is_file() and f.suffix.lower() in (".txt", ".list", ".m3u")
-    ]
+    exts = {".txt", ".list", ".m3u"}
+    # DirEntry.is_file() answers from the readdir() type (no stat() unless the
+    # entry is a symlink); filter first so only playlist files are sorted
+    with os.scandir(p) as it:
+        files = [
+            Path(e.path)
+            for e in it
+            if e.is_file() and os.path.splitext(e.name)[1].lower() in exts
+        ]
+    files.sort(key=lambda f: f.name)
     logging.debug("Found %d playlist files in %s", len(files), folder)
     return files
 
@@ -1549,14 +2179,16 @@ def play_from_list_file(
     """
     logging.info("Playing list file: %s", path)
     try:
+        # strip and drop blanks/comments in a single pass over the file
         with open(path, encoding="utf-8") as f:
-            lines = [l.strip() for l in f.readlines()]
+            entries = [
+                s for s in (line.strip() for line in f) if s and not s.startswith("#")
+            ]
     except Exception as e:
         logging.error("Failed to read list file %s: %s", path, e)
         print("Failed to read list file:", e)
         return
 
-    entries = [l for l in lines if l and not l.startswith("#")]
     if not entries:
         print("No URLs found in", path)
         return
@@ -1564,181 +2196,202 @@ def play_from_list_file(
     # If shuffle_all, flatten all entries (expand playlists) and shuffle the result
     if shuffle_all:
         logging.info("Expanding all playlists for shuffle_all mode")
-        flattened = []
-        for raw in entries:
-            if is_url(raw) and is_playlist(raw):
-                pl_entries = playlist_to_entries(raw)
-                for pe in pl_entries or []:
-                    flattened.append(pe.get("webpage_url") or pe.get("url"))
-            elif is_url(raw):
-                flattened.append(raw)
-        entries = flattened
+
+        def _expand(raw: str) -> list:
+            if is_playlist(raw):
+                # keep the flat entry dicts; they already carry title/duration
+                return playlist_to_entries(raw) or []
+            return [raw]
+
+        urls = [raw for raw in entries if is_url(raw)]
+        # Each expansion is an independent network round-trip; run them in
+        # parallel and keep file order (ex.map) until the shuffle below.
+        with ThreadPoolExecutor(max_workers=max(1, min(16, len(urls)))) as ex:
+            entries = list(itertools.chain.from_iterable(ex.map(_expand, urls)))
         random.shuffle(entries)
         logging.info("After shuffle_all: %d total entries", len(entries))
     # Optionally shuffle the top-level entries from the file (only if shuffle_all not used)
     elif shuffle:
         random.shuffle(entries)
 
-    for i, raw in enumerate(entries, 1):
-        print(f"\n== List item {i}/{len(entries)}: {raw}")
-        logging.info(
-            "List file %s: playing entry %d/%d: %s", path, i, len(entries), raw
-        )
-        # If it's a playlist URL, expand and play entries
-        if is_url(raw) and is_playlist(raw):
-            print("Playlist URL detected – fetching all entries …")
-            logging.info("Playlist URL detected in list file: %s", raw)
-            pl_entries = playlist_to_entries(raw)
-            if pl_entries:
-                interactive_play(
-                    pl_entries, cfg, playlist_url=raw, video_mode=video_mode
-                )
-            else:
-                print("Empty or unavailable playlist.")
-            # after playlist finished, continue to next list file line
-            continue
-
-        # If it's a URL (single video), play it similarly to interactive single play
-        if is_url(raw):
-            title = None
-            try:
-                info = get_video_info(raw)
-                title = info.get("title") if info else None
-            except Exception:
-                info = None
-
-            print(f"Now playing: {title or raw}")
-            # record history
-            try:
-                append_history(
-                    {
-                        "type": "list_item",
-                        "playlist_url": str(path),
-                        "track_url": raw,
-                        "title": title,
-                        "timestamp": int(time.time()),
-                    }
-                )
-            except Exception:
-                pass
-
-            # Use cache if configured
-            play_target = raw
-            if cfg.get("PlaybackMethod") == "cache":
-                filepath = download_to_cache(raw, cfg, video_mode=video_mode)
-                if not filepath:
-                    print("  Failed to download to cache.")
-                    logging.info("Cache download failed for %s", raw)
-                    continue
-                play_target = str(filepath)
-
-            # Start player and allow user controls similar to interactive_play
-            player = play_stream(
-                play_target, silent=not cfg.get("Debug", False), video_mode=video_mode
+    prefetch = (
+        _CachePrefetcher(cfg, video_mode=video_mode)
+        if cfg.get("PlaybackMethod") == "cache"
+        else None
+    )
+    try:
+        for i, raw in enumerate(entries, 1):
+            # shuffle_all yields flat playlist entry dicts alongside plain URLs
+            entry = None
+            if isinstance(raw, dict):
+                entry = raw
+                raw = entry.get("webpage_url") or entry.get("url") or ""
+            print(f"\n== List item {i}/{len(entries)}: {raw}")
+            logging.info(
+                "List file %s: playing entry %d/%d: %s", path, i, len(entries), raw
             )
-            if player is None:
-                print("  Failed to start player.")
-                logging.info("Player failed to start for %s", raw)
+            # If it's a playlist URL, expand and play entries
+            if is_url(raw) and is_playlist(raw):
+                print("Playlist URL detected – fetching all entries …")
+                logging.info("Playlist URL detected in list file: %s", raw)
+                pl_entries = playlist_to_entries(raw)
+                if pl_entries:
+                    interactive_play(
+                        pl_entries, cfg, playlist_url=raw, video_mode=video_mode
+                    )
+                else:
+                    print("Empty or unavailable playlist.")
+                # after playlist finished, continue to next list file line
                 continue
 
-            user_action = None
-            start_ts = time.time()
-            try:
-                while player.poll() is None:
-                    # In auto_mode, skip all user input checks
-                    if not auto_mode:
-                        if platform.system() == "Windows":
-                            import msvcrt
-
-                            if msvcrt.kbhit():
-                                ch = msvcrt.getch().decode().lower()
-                                logging.debug("User pressed key: %s", ch)
-                                if ch == "n":
-                                    logging.debug("User requested next item in list.")
-                                    player.terminate()
-                                    user_action = "next"
-                                    break
-                                elif ch == "r":
-                                    logging.debug("User requested replay.")
-                                    player.terminate()
-                                    user_action = "replay"
-                                    break
-                                elif ch == "q":
-                                    logging.debug("User requested quit.")
-                                    player.terminate()
-                                    return
-                        else:
-                            import select
-
-                            if select.select([sys.stdin], [], [], 0)[0]:
-                                ch = sys.stdin.read(1).lower()
-                                logging.debug("User pressed key: %s", ch)
-                                if ch == "n":
-                                    logging.debug("User requested next item in list.")
-                                    player.terminate()
-                                    user_action = "next"
-                                    break
-                                elif ch == "r":
-                                    logging.debug("User requested replay.")
-                                    player.terminate()
-                                    user_action = "replay"
-                                    break
-                                elif ch == "q":
-                                    logging.debug("User requested quit.")
-                                    player.terminate()
-                                    return
-
-                    # show elapsed in audio mode
-                    if not video_mode:
-                        elapsed = int(time.time() - start_ts)
-                        if info and info.get("duration"):
-                            total = int(info.get("duration"))
-                            sys.stdout.write(f"\rElapsed: {elapsed}s / {total}s ")
-                        else:
-                            sys.stdout.write(f"\rElapsed: {elapsed}s")
-                        sys.stdout.flush()
-                    time.sleep(0.1)
-            except KeyboardInterrupt:
-                logging.debug("KeyboardInterrupt: terminating player.")
-                player.terminate()
-                return
+            # If it's a URL (single video), play it similarly to interactive single play
+            if is_url(raw):
+                title = None
+                try:
+                    # Prefer the already-expanded entry over another network call
+                    if entry and entry.get("title"):
+                        info = entry
+                    else:
+                        info = get_video_info(raw)
+                    title = info.get("title") if info else None
+                except Exception:
+                    info = None
 
-            # Clear elapsed line in audio mode
-            if not video_mode:
+                print(f"Now playing: {title or raw}")
+                # record history
                 try:
-                    sys.stdout.write("\r" + " " * 60 + "\r")
+                    _HISTORY.enqueue(
+                        {
+                            "type": "list_item",
+                            "playlist_url": str(path),
+                            "track_url": raw,
+                            "title": title,
+                            "timestamp": int(time.time()),
+                        }
+                    )
                 except Exception:
                     pass
 
-            # In auto_mode, skip all post-play prompts and just continue
-            if auto_mode:
-                logging.info("auto_mode: continuing to next item")
-                continue
+                # Use cache if configured
+                play_target = raw
+                if prefetch:
+                    filepath = prefetch.fetch(raw)
+                    if not filepath:
+                        print("  Failed to download to cache.")
+                        logging.info("Cache download failed for %s", raw)
+                        continue
+                    play_target = str(filepath)
 
-            # Replay handling
-            if user_action == "replay":
-                # replay same item
+                # Start player and allow user controls similar to interactive_play
+                player = play_stream(
+                    play_target,
+                    silent=not cfg.get("Debug", False),
+                    video_mode=video_mode,
+                )
+                if player is None:
+                    print("  Failed to start player.")
+                    logging.info("Player failed to start for %s", raw)
+                    continue
+                # entries is 0-based, so entries[i] is the next line
+                if prefetch and i < len(entries):
+                    nxt = entries[i]
+                    if isinstance(nxt, dict):
+                        nxt = nxt.get("webpage_url") or nxt.get("url")
+                    if nxt and is_url(nxt) and not is_playlist(nxt):
+                        prefetch.submit(nxt)
+
+                user_action = None
+                start_ts = time.time()
                 try:
+                    with _cbreak_stdin():
+                        while player.poll() is None:
+                            # In auto_mode, skip all user input checks
+                            ch = wait_for_event(player, 1.0, keys=not auto_mode)
+                            if ch:
+                                logging.debug("User pressed key: %s", ch)
+                            if ch == "n":
+                                logging.debug("User requested next item in list.")
+                                _kill_tree(player)
+                                user_action = "next"
+                                break
+                            elif ch == "r":
+                                logging.debug("User requested replay.")
+                                _kill_tree(player)
+                                user_action = "replay"
+                                break
+                            elif ch == "q":
+                                logging.debug("User requested quit.")
+                                _kill_tree(player)
+                                return
+
+                            # show elapsed in audio mode
+                            if not video_mode:
+                                elapsed = int(time.time() - start_ts)
+                                if info and info.get("duration"):
+                                    total = int(info.get("duration"))
+                                    sys.stdout.write(
+                                        f"\rElapsed: {elapsed}s / {total}s "
+                                    )
+                                else:
+                                    sys.stdout.write(f"\rElapsed: {elapsed}s")
+                                sys.stdout.flush()
+                except KeyboardInterrupt:
+                    logging.debug("KeyboardInterrupt: terminating player.")
+                    _kill_tree(player)
+                    return
+
+                # Clear elapsed line in audio mode
+                if not video_mode:
+                    try:
+                        sys.stdout.write("\r" + " " * 60 + "\r")
+                    except Exception:
+                        pass
+
+                # In auto_mode, skip all post-play prompts and just continue
+                if auto_mode:
+                    logging.info("auto_mode: continuing to next item")
                     continue
-                except Exception:
-                    pass
-            # If next was requested, continue to next URL in file
-            if user_action == "next":
-                continue
 
-            # natural end: continue to next file entry
-            continue
-        else:
-            logging.debug("Skipping non-URL line in list file: %s", raw)
-            continue
+                # Replay handling
+                if user_action == "replay":
+                    # replay same item
+                    try:
+                        continue
+                    except Exception:
+                        pass
+                # If next was requested, continue to next URL in file
+                if user_action == "next":
+                    continue
+
+                # natural end: continue to next file entry
+                continue
+            else:
+                logging.debug("Skipping non-URL line in list file: %s", raw)
+                continue
+    finally:
+        if prefetch:
+            prefetch.close()
 
 
 # ------------------------------------------------------------------
 # Cached playback helpers (start, send key, pause/resume)
 # ------------------------------------------------------------------
+# Shared sink for player output, opened once rather than per Popen.
+_DEVNULL = open(os.devnull, "wb")
+
+
+@functools.lru_cache(maxsize=1)
+def _ffplay_path() -> str:
+    return shutil.which("ffplay") or "ffplay"
+
+
 def _start_ffplay_for_file(filepath: str, cfg: dict, silent: bool) -> subprocess.Popen:
+    # An absolute executable plus close_fds=False lets CPython spawn via
+    # posix_spawn() instead of fork+exec; our own fds are non-inheritable.
     ffplay_cmd = [
-        "ffplay",
+        _ffplay_path(),
+        "-hide_banner",
+        "-nostats",
         "-i",
         str(filepath),
         "-nodisp",
@@ -1746,18 +2399,19 @@ def _start_ffplay_for_file(filepath: str, cfg: dict, silent: bool) -> subprocess
         "-loglevel",
         "info" if not silent else "quiet",
     ]
-    logging.debug("ffplay cmd (cache, controllable stdin): %s", " ".join(ffplay_cmd))
+    logging.debug("ffplay cmd (cache, controllable stdin): %s", _LazyJoin(ffplay_cmd))
     try:
         proc = subprocess.Popen(
             ffplay_cmd,
             stdin=subprocess.PIPE,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
+            stdout=_DEVNULL,
+            stderr=_DEVNULL,
+            close_fds=False,
         )
         logging.info(
             "ffplay started for cached file %s (pid=%s)",
             filepath,
-            getattr(proc, "pid", None),
+            proc.pid,
         )
         return proc
     except Exception as e:
@@ -1766,18 +2420,16 @@ def _start_ffplay_for_file(filepath: str, cfg: dict, silent: bool) -> subprocess
 
 
 def _ffplay_send_key(proc: subprocess.Popen, key: bytes = b"p") -> bool:
-    if not proc or proc.poll() is not None:
-        logging.debug("_ffplay_send_key: process not running or exited")
-        return False
+    # No poll() first: once ffplay has gone the write fails with EPIPE anyway,
+    # and a missing proc/stdin raises AttributeError.
     try:
-        if proc.stdin:
-            proc.stdin.write(key)
-            proc.stdin.flush()
-            logging.debug("Wrote key %r to ffplay stdin (pid=%s)", key, proc.pid)
-            return True
-    except Exception as e:
+        proc.stdin.write(key)
+        proc.stdin.flush()
+    except (AttributeError, OSError, ValueError) as e:
         logging.debug("Failed to write to ffplay stdin: %s", e)
-    return False
+        return False
+    logging.debug("Wrote key %r to ffplay stdin (pid=%s)", key, proc.pid)
+    return True
 
 
 def _suspend_process_posix(proc: subprocess.Popen) -> bool:
@@ -1802,16 +2454,12 @@ def _resume_process_posix(proc: subprocess.Popen) -> bool:
 
 def pause_cached_playback(proc: subprocess.Popen) -> bool:
     if _ffplay_send_key(proc, b"p"):
-        logging.info(
-            "Toggled pause via ffplay stdin (pid=%s)", getattr(proc, "pid", None)
-        )
+        logging.info("Toggled pause via ffplay stdin (pid=%s)", proc.pid)
         return True
-    if os.name == "posix":
+    if not IS_WINDOWS:
         ok = _suspend_process_posix(proc)
         if ok:
-            logging.info(
-                "Paused ffplay via SIGSTOP (pid=%s)", getattr(proc, "pid", None)
-            )
+            logging.info("Paused ffplay via SIGSTOP (pid=%s)", proc.pid)
         return ok
     logging.warning("Unable to pause ffplay process on this platform.")
     return False
@@ -1819,98 +2467,139 @@ def pause_cached_playback(proc: subprocess.Popen) -> bool:
 
 def resume_cached_playback(proc: subprocess.Popen) -> bool:
     if _ffplay_send_key(proc, b"p"):
-        logging.info(
-            "Toggled resume via ffplay stdin (pid=%s)", getattr(proc, "pid", None)
-        )
+        logging.info("Toggled resume via ffplay stdin (pid=%s)", proc.pid)
         return True
-    if os.name == "posix":
+    if not IS_WINDOWS:
         ok = _resume_process_posix(proc)
         if ok:
-            logging.info(
-                "Resumed ffplay via SIGCONT (pid=%s)", getattr(proc, "pid", None)
-            )
+            logging.info("Resumed ffplay via SIGCONT (pid=%s)", proc.pid)
         return ok
     logging.warning("Unable to resume ffplay process on this platform.")
     return False
 
 
+def _partial_shuffle(items: list, k: int, start: int = 0):
+    """Fisher-Yates over items[start:start + k] only, drawing from the whole tail.
+
+    Successive calls covering the list give the same distribution as a full
+    random.shuffle, so playback can start before the rest is shuffled.
+    """
+    n = len(items)
+    for i in range(start, min(start + k, n)):
+        j = random.randrange(i, n)
+        items[i], items[j] = items[j], items[i]
+
+
+def _sidecar_title(sidecar: Optional[str]) -> Optional[str]:
+    if not sidecar:
+        return None
+    try:
+        with open(sidecar, "rb") as sf:
+            return _json_loads(sf.read()).get("title")
+    except Exception:
+        return None
+
+
+def _prefetch_offline_track(path: str, sidecar: Optional[str], titles: dict):
+    """Warm the page cache for the next offline track and parse its sidecar."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            else:
+                os.read(fd, 1 << 16)  # at least the container header
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logging.debug("offline: prefetch of %s failed: %s", path, e)
+    titles[path] = _sidecar_title(sidecar)
+
+
 def offline_play(cfg: dict):
     """Hidden command: play cached audio files in shuffle order.
     Controls while playing: n=next, p=toggle pause, q=quit
     """
     cache_dir = ensure_cache_dir(cfg)
-    files = [
-        p
-        for p in cache_dir.iterdir()
-        if p.is_file() and p.suffix.lower() not in (".json",)
-    ]
+    # one directory pass: media files to play, plus a stem -> sidecar index so
+    # the loop below needs no per-track exists() check
+    files = []
+    sidecars = {}
+    with os.scandir(cache_dir) as it:
+        for e in it:
+            if not e.is_file():
+                continue
+            name = e.name
+            if name.endswith(".json"):
+                sidecars[name[:-5]] = e.path
+            elif not name.endswith(_CACHE_NON_MEDIA_SUFFIXES):
+                # skips yt-dlp's .part/.ytdl files from unfinished downloads
+                files.append(e)
     if not files:
         print("No cached audio files found in", str(cache_dir))
         logging.info("offline: no cached files in %s", cache_dir)
         return
-    random.shuffle(files)
+    # shuffle lazily in chunks; most sessions only hear the first few tracks
+    chunk = 128
+    _partial_shuffle(files, chunk)
+    shuffled = chunk
     logging.info("offline: playing %d cached files (shuffled)", len(files))
-    idx = 0
-    while 0 <= idx < len(files):
-        f = files[idx]
-        title = f.name
-        # try sidecar metadata
-        sidecar = f.with_suffix(".json")
-        if sidecar.exists():
-            try:
-                with open(sidecar, encoding="utf-8") as sf:
-                    meta = json.load(sf)
-                    title = meta.get("title") or title
-            except Exception:
-                pass
-        print(f"\nOffline play [{idx+1}/{len(files)}]: {title}")
-        logging.info("offline now playing: %s", f)
-        # start ffplay with controllable stdin
-        player = _start_ffplay_for_file(str(f), cfg, silent=not cfg.get("Debug", False))
-        if player is None:
-            logging.warning("offline: failed to start player for %s", f)
-            idx += 1
-            continue
-        try:
-            while player.poll() is None:
-                # check for keypress
-                if platform.system() == "Windows":
-                    import msvcrt
-
-                    if msvcrt.kbhit():
-                        ch = msvcrt.getch().decode().lower()
-                        logging.debug("offline: user pressed key: %s", ch)
-                        if ch == "n":
-                            player.terminate()
-                            break
-                        elif ch == "p":
-                            _ffplay_send_key(player, b"p")
-                        elif ch == "q":
-                            player.terminate()
-                            return
-                else:
-                    import select
-
-                    if select.select([sys.stdin], [], [], 0)[0]:
-                        ch = sys.stdin.read(1).lower()
-                        logging.debug("offline: user pressed key: %s", ch)
-                        if ch == "n":
-                            player.terminate()
-                            break
-                        elif ch == "p":
-                            _ffplay_send_key(player, b"p")
-                        elif ch == "q":
-                            player.terminate()
-                            return
-                time.sleep(0.1)
-        except KeyboardInterrupt:
-            logging.debug("offline: KeyboardInterrupt, terminating player.")
+    titles = {}  # path -> sidecar title, filled ahead of time by the prefetcher
+    # single keys (n/p/q) should act without Enter
+    with _cbreak_stdin():
+        for idx, f in enumerate(files, 1):
+            if idx == shuffled:
+                # files[idx] is next (and about to be prefetched); extend the prefix
+                _partial_shuffle(files, chunk, shuffled)
+                shuffled += chunk
+            # try sidecar metadata
+            if f.path in titles:
+                title = titles.pop(f.path)
+            else:
+                title = _sidecar_title(sidecars.get(os.path.splitext(f.name)[0]))
+            title = title or f.name
+            print(f"\nOffline play [{idx}/{len(files)}]: {title}")
+            logging.info("offline now playing: %s", f.path)
+            # start ffplay with controllable stdin
+            player = _start_ffplay_for_file(
+                f.path, cfg, silent=not cfg.get("Debug", False)
+            )
+            if player is None:
+                logging.warning("offline: failed to start player for %s", f.path)
+                continue
+            if idx < len(files):
+                nxt = files[idx]
+                threading.Thread(
+                    target=_prefetch_offline_track,
+                    args=(
+                        nxt.path,
+                        sidecars.get(os.path.splitext(nxt.name)[0]),
+                        titles,
+                    ),
+                    daemon=True,
+                ).start()
             try:
-                player.terminate()
-            except Exception:
-                pass
-            return
-        idx += 1
+                while player.poll() is None:
+                    # nothing to redraw here, so sleep until a key or player exit
+                    ch = wait_for_event(player, None)
+                    if not ch:
+                        continue
+                    logging.debug("offline: user pressed key: %s", ch)
+                    if ch == "n":
+                        player.terminate()
+                        break
+                    elif ch == "p":
+                        _ffplay_send_key(player, b"p")
+                    elif ch == "q":
+                        player.terminate()
+                        return
+            except KeyboardInterrupt:
+                logging.debug("offline: KeyboardInterrupt, terminating player.")
+                try:
+                    player.terminate()
+                except Exception:
+                    pass
+                return
     print("Offline playback finished.")
     logging.info("offline: finished playing cached files")
 
@@ -1918,7 +2607,41 @@ def offline_play(cfg: dict):
 # ------------------------------------------------------------------
 # Main
 # ------------------------------------------------------------------
-def main():
+_PROMPT_COMMANDS = ("config", "exit", "history", "q", "quit")
+
+
+def _init_readline():
+    """Enable line editing, prompt history and command completion if available."""
+    try:
+        import readline
+    except ImportError:
+        return  # e.g. Windows without pyreadline3
+    readline.set_history_length(1000)
+    try:
+        readline.read_history_file(PROMPT_HISTORY_FILE)
+    except OSError:
+        pass
+
+    def _save():
+        try:
+            readline.write_history_file(PROMPT_HISTORY_FILE)
+        except OSError as e:
+            logging.debug("Could not save prompt history: %s", e)
+
+    atexit.register(_save)
+
+    def _complete(text: str, state: int) -> Optional[str]:
+        matches = [c for c in _PROMPT_COMMANDS if c.startswith(text.lower())]
+        return matches[state] if state < len(matches) else None
+
+    readline.set_completer(_complete)
+    if "libedit" in (readline.__doc__ or ""):
+        readline.parse_and_bind("bind ^I rl_complete")
+    else:
+        readline.parse_and_bind("tab: complete")
+
+
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Lightweight YouTube player")
     parser.add_argument(
         "input", nargs="?", help="Search query, video URL, or playlist URL"
@@ -1964,42 +2687,28 @@ def main():
         action="store_true",
         help="Auto-advance through --list without user prompts (non-interactive mode)",
     )
-    args = parser.parse_args()
-
-    logging.debug("main() called")
-    cfg = load_config()
-    if args.debug:
-        cfg["Debug"] = True
-    if getattr(args, "force_cache_refresh", False):
-        cfg["ForceCacheRefresh"] = True
-    logging.debug("Debug mode: %s", cfg["Debug"])
-    init_logger(cfg["Debug"])
-    logging.info("Player starting. Debug=%s", cfg["Debug"])
+    return parser
 
-    # Check for and clean up any state from previous crash
-    cleanup_crashed_state()
 
-    # Prevent Windows from going to sleep during playback
-    prevent_sleep_windows()
+_PARSER = _build_parser()
 
-    # Check for mpv if video mode enabled
-    if args.video:
-        logging.info("Video mode enabled, checking for mpv player")
-        if not ensure_dependencies(check_mpv=True):
-            sys.exit("mpv player required for video mode")
 
-    ensure_dependencies()
+def _check_yt_dlp_update(latest_v: Optional[str], update_now: bool, ask: bool):
+    """Compare the installed yt-dlp with latest_v and offer an update.
 
-    # Check yt-dlp version and notify if update available. Optionally attempt update.
+    update_now updates without asking (--update-yt-dlp); ask allows the
+    interactive prompt, which is skipped for notices shown mid-session.
+    """
     try:
         installed_v = _get_installed_yt_dlp_version()
-        latest_v = _get_latest_yt_dlp_version_pypi()
         if installed_v and latest_v:
             logging.debug(
                 "yt-dlp installed version=%s latest=%s", installed_v, latest_v
             )
             try:
-                if _is_version_greater(latest_v, installed_v):
+                if latest_v != installed_v and _is_version_greater(
+                    latest_v, installed_v
+                ):
                     msg = f"A newer yt-dlp is available: {installed_v} -> {latest_v}."
                     print(msg)
                     logging.info(msg)
@@ -2011,7 +2720,7 @@ def main():
                     for c in cmds:
                         print("  ", c)
                     # If user passed the flag, attempt update non-interactively
-                    if args.update_yt_dlp:
+                    if update_now:
                         print(
                             "Attempting runtime update using detected method:", method
                         )
@@ -2026,7 +2735,7 @@ def main():
                                 "Automatic update failed. See logs for details and try one of the suggested commands."
                             )
                     # Otherwise, if running interactively, ask the user
-                    elif sys.stdin is not None and sys.stdin.isatty():
+                    elif ask and sys.stdin is not None and sys.stdin.isatty():
                         try:
                             resp = input("Update yt-dlp now? [Y/n]: ").strip().lower()
                         except (EOFError, KeyboardInterrupt):
@@ -2052,10 +2761,14 @@ def main():
                             print(
                                 "Skipping automatic update. You can update later using one of the suggested commands."
                             )
-                    else:
+                    elif ask:
                         print(
                             "Non-interactive session: run with --update-yt-dlp to attempt an automatic update or run one of the suggested commands manually."
                         )
+                    else:
+                        print(
+                            "Run with --update-yt-dlp to attempt an automatic update or run one of the suggested commands manually."
+                        )
                 else:
                     logging.debug("yt-dlp is up-to-date (%s)", installed_v)
             except Exception as e:
@@ -2069,6 +2782,49 @@ def main():
     except Exception as e:
         logging.debug("yt-dlp update check failed: %s", e)
 
+
+def main():
+    args = _PARSER.parse_args()
+
+    logging.debug("main() called")
+    cfg = load_config()
+    if args.debug:
+        cfg["Debug"] = True
+    if getattr(args, "force_cache_refresh", False):
+        cfg["ForceCacheRefresh"] = True
+    logging.debug("Debug mode: %s", cfg["Debug"])
+    init_logger(cfg["Debug"])
+    logging.info("Player starting. Debug=%s", cfg["Debug"])
+
+    # Look up the latest yt-dlp in the background so the network round-trip
+    # (when the cached answer is stale) overlaps the dependency checks below.
+    # --update-yt-dlp always asks PyPI.
+    latest_lookup = _BackgroundCall(
+        _cached_latest_yt_dlp_version, force=args.update_yt_dlp
+    )
+
+    # Check for and clean up any state from previous crash
+    cleanup_crashed_state()
+
+    # Prevent Windows from going to sleep during playback
+    prevent_sleep_windows()
+
+    # Check for mpv if video mode enabled
+    if args.video:
+        logging.info("Video mode enabled, checking for mpv player")
+        if not ensure_dependencies(check_mpv=True):
+            sys.exit("mpv player required for video mode")
+
+    ensure_dependencies()
+
+    # --update-yt-dlp waits for PyPI. Otherwise only an answer that is
+    # already there (usually the on-disk cache) is used now; a fetch still
+    # in flight is reported from the prompt loop once it lands.
+    latest_v = latest_lookup.result(None if args.update_yt_dlp else 0.2)
+    update_check_pending = not latest_lookup.done()
+    if not update_check_pending:
+        _check_yt_dlp_update(latest_v, args.update_yt_dlp, ask=True)
+
     # If offline flag passed, start offline playback and exit
     if getattr(args, "offline", False):
         logging.info("Starting offline playback (cache) via --offline flag")
@@ -2119,7 +2875,11 @@ def main():
     else:
         # interactive session
         logging.debug("Entering interactive session loop. Video mode: %s", args.video)
+        _init_readline()
         while True:
+            if update_check_pending and latest_lookup.done():
+                update_check_pending = False
+                _check_yt_dlp_update(latest_lookup.result(), False, ask=False)
             try:
                 prompt = "YouTube(video)> " if args.video else "YouTube> "
                 raw = input(f"\n{prompt}").strip()
@@ -2165,21 +2925,10 @@ def main():
                         k, v = line.split("=", 1)
                         k = k.strip()
                         v = v.strip()
-                        # simple type coercion
-                        if v.lower() in ("true", "false"):
-                            parsed = v.lower() == "true"
-                        else:
-                            try:
-                                parsed = int(v)
-                            except Exception:
-                                try:
-                                    parsed = float(v)
-                                except Exception:
-                                    parsed = v
-                        cfg_current[k] = parsed
+                        cfg_current[k] = _parse_config_value(k, v)
                     try:
-                        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-                            json.dump(cfg_current, f, ensure_ascii=False, indent=2)
+                        with open(CONFIG_FILE, "wb") as f:
+                            f.write(_json_dumps(cfg_current))
                         print("Config saved to", CONFIG_FILE)
                         logging.info("Config saved to %s", CONFIG_FILE)
                         # update live cfg used by the session
@@ -2191,8 +2940,4 @@ def main():
 
 
 if __name__ == "__main__":
-    try:
-        import shutil
-    except ImportError:
-        import shutil
     main()